@@ -1,5 +1,5 @@
 import os
-import json
+import orjson
 import difflib
 from datetime import datetime, timezone
 from typing import Optional, Tuple
@@ -7,16 +7,25 @@ import aiohttp
 import urllib.parse
 from io import BytesIO
 from PIL import Image
+from rapidfuzz import fuzz, process
 import asyncio
+import atexit
+import functools
+import hashlib
+import math
+import pickle
+import queue
 import re
+import threading
 import time
+import unicodedata
 import logging
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import Future, ThreadPoolExecutor
+from cachetools import TTLCache
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import Select
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException
@@ -28,10 +37,30 @@ from selenium.webdriver.chrome.service import Service
 VOUCHES_PATH = 'vouches.json'
 ARCHIVE_PATH = 'vouch_archive.json'
 ITEMS_PATH = 'items.json'
+ITEMS_CACHE_PATH = 'items_lookup.pkl'
+# Bump when the lookup layout built by load_items_database changes
+ITEMS_CACHE_VERSION = 2
+
+# Long-lived Chrome drivers shared across scrapes
+POOL_SIZE = 3
+DRIVER_MAX_USES = 50
+
+# Cosmetic categories that are valued
+VALID_CATEGORY_NAMES = ["Artifact", "Cape", "Killphrase", "Projectile", "Mount"]
+
+# Seconds a successful scrape is served from memory
+INVENTORY_CACHE_TTL = 60
+
+# Compiled once; used per item / per category while scraping
+_COUNT_RE = re.compile(r'\[?(\d+)/(\d+)\]?')
+_CURRENCY_RE = re.compile(r'[^\d.]')
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
-executor = ThreadPoolExecutor(max_workers=3)
+# Runs blocking scrapes for the API; sized so each worker can hold a pooled driver
+executor = ThreadPoolExecutor(max_workers=POOL_SIZE)
+# Scrapes the categories of one profile in parallel, one pooled driver each
+category_executor = ThreadPoolExecutor(max_workers=POOL_SIZE)
 
 # =============================
 # Helpers
@@ -40,44 +69,136 @@ executor = ThreadPoolExecutor(max_workers=3)
 
 
 
-async def fetch_image(url: str) -> Optional[bytes]:
-    """Fetch an image from a URL and return its bytes."""
-    async with aiohttp.ClientSession() as session:
-        try:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    content_type = response.headers.get('content-type', '')
-                    if 'image' not in content_type:
-                        return None
-                    data = await response.read()
-                    # Verify image size (Discord avatar size limit: 8MB)
-                    if len(data) > 8 * 1024 * 1024:
-                        return None
-                    # Optionally process image with Pillow
-                    try:
-                        img = Image.open(BytesIO(data))
-                        # Convert to PNG or JPEG if needed
-                        output = BytesIO()
-                        img.save(output, format='PNG')
-                        return output.getvalue()
-                    except Exception:
-                        return data  # Fallback to raw data if processing fails
-                return None
-        except Exception as e:
-            print(f"Error fetching image from {url}: {e}")
-            return None
+_http_session: Optional[aiohttp.ClientSession] = None
+
+
+async def get_http_session() -> aiohttp.ClientSession:
+    """Return the shared aiohttp session, creating it on first use."""
+    global _http_session
+    if _http_session is None or _http_session.closed:
+        _http_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=100, limit_per_host=20, ttl_dns_cache=300),
+            timeout=aiohttp.ClientTimeout(total=15),
+        )
+    return _http_session
+
+
+async def close_http_session() -> None:
+    """Close the shared aiohttp session if it was opened."""
+    global _http_session
+    if _http_session is not None and not _http_session.closed:
+        await _http_session.close()
+    _http_session = None
+
+
+def _sniff_image_format(data: bytes) -> Optional[str]:
+    """Identify PNG/JPEG/WebP/GIF payloads from their magic bytes."""
+    if data[:8] == b'\x89PNG\r\n\x1a\n':
+        return 'png'
+    if data[:3] == b'\xff\xd8\xff':
+        return 'jpeg'
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'webp'
+    if data[:6] in (b'GIF87a', b'GIF89a'):
+        return 'gif'
+    return None
+
+
+async def fetch_image(url: str, force_png: bool = False) -> Optional[bytes]:
+    """Fetch an image from a URL and return its bytes.
+
+    Images already in a Discord-supported format are returned untouched;
+    Pillow is only used when ``force_png`` is set or the format is unknown.
+    """
+    session = await get_http_session()
     try:
-        with open(path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception:
-        # Corrupted JSON or empty file -> safely return empty
-        return {}
+        async with session.get(url) as response:
+            if response.status == 200:
+                content_type = response.headers.get('content-type', '')
+                if 'image' not in content_type:
+                    return None
+                data = await response.read()
+                # Verify image size (Discord avatar size limit: 8MB)
+                if len(data) > 8 * 1024 * 1024:
+                    return None
+                if not force_png and _sniff_image_format(data) is not None:
+                    return data
+                try:
+                    img = Image.open(BytesIO(data))
+                    output = BytesIO()
+                    img.save(output, format='PNG')
+                    return output.getvalue()
+                except Exception:
+                    return data  # Fallback to raw data if processing fails
+            return None
+    except Exception as e:
+        print(f"Error fetching image from {url}: {e}")
+        return None
+
+
 
 
 
 
+def normalize_item_name(name):
+    """Lowercase, strip diacritics and punctuation, and collapse whitespace"""
+    decomposed = unicodedata.normalize('NFKD', name.lower())
+    return ' '.join(''.join(c for c in decomposed if c.isalnum() or c.isspace()).split())
 
 
+def compact_item_name(key):
+    """Spaceless form of a normalized name, e.g. 'hot dog hat' -> 'hotdoghat'"""
+    return key.replace(' ', '')
+
+
+def parse_currency(value_str):
+    """Parse currency string to float with robust handling"""
+    if not value_str or value_str == 'N/A' or value_str == '':
+        return 0.0
+    
+    try:
+        # Remove currency symbols, commas, and whitespace
+        cleaned = _CURRENCY_RE.sub('', str(value_str))
+        return float(cleaned) if cleaned else 0.0
+    except (ValueError, AttributeError) as e:
+        logger.warning(f"Failed to parse currency '{value_str}': {e}")
+        return 0.0
+
+def _read_items_cache(source_stat):
+    """Return the pickled lookup if it was built from the current items.json"""
+    try:
+        with open(ITEMS_CACHE_PATH, 'rb') as f:
+            cached = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable items cache: {e}")
+        return None
+    
+    if (
+        cached.get('version') != ITEMS_CACHE_VERSION
+        or cached.get('mtime') != source_stat.st_mtime_ns
+        or cached.get('size') != source_stat.st_size
+    ):
+        return None
+    return cached['lookup']
+
+def _write_items_cache(source_stat, items_lookup):
+    """Persist the built lookup next to items.json for the next process start"""
+    payload = {
+        'version': ITEMS_CACHE_VERSION,
+        'mtime': source_stat.st_mtime_ns,
+        'size': source_stat.st_size,
+        'lookup': items_lookup,
+    }
+    try:
+        tmp_path = f"{ITEMS_CACHE_PATH}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, ITEMS_CACHE_PATH)
+    except Exception as e:
+        logger.warning(f"Could not write items cache: {e}")
+
 # Load items database
 def load_items_database():
     """Load and validate items database"""
@@ -110,33 +231,54 @@ def load_items_database():
                     }
                 ]
             }
-            with open('items.json', 'w', encoding='utf-8') as f:
-                json.dump(dummy_data, f, indent=2)
+            items_file.write_bytes(orjson.dumps(dummy_data, option=orjson.OPT_INDENT_2))
             logger.info("Created dummy items.json")
         
-        with open('items.json', 'r', encoding='utf-8') as f:
-            items_data = json.load(f)
+        source_stat = items_file.stat()
+        cached = _read_items_cache(source_stat)
+        if cached is not None:
+            logger.info(f"Loaded {len(cached)} items from cache")
+            return cached
+        
+        items_data = orjson.loads(items_file.read_bytes())
         
         if 'items' not in items_data:
             raise ValueError("Invalid items.json structure: missing 'items' key")
         
         items_lookup = {}
+        compact_keys = {}
         for item in items_data['items']:
             if 'name' in item:
-                # Create multiple lookup keys for robustness
-                name_lower = item['name'].lower().strip()
-                items_lookup[name_lower] = item
-                # Also store without special characters
-                name_clean = re.sub(r'[^\w\s]', '', name_lower)
-                items_lookup[name_clean] = item
+                # Parse prices once so scrapes can sum the floats directly
+                item['_usd'] = parse_currency(item.get('usd', '0'))
+                item['_coins'] = parse_currency(item.get('coins', '0'))
+                item['_shards'] = parse_currency(item.get('shards', '0'))
+                key = normalize_item_name(item['name'])
+                if key in items_lookup:
+                    logger.warning(f"Duplicate item name '{item['name']}' in items.json, keeping the first entry")
+                    continue
+                items_lookup[key] = item
+                compact_keys.setdefault(compact_item_name(key), []).append(key)
+        item_count = len(items_lookup)
+        
+        # Spaceless aliases catch scrapes like 'HotDog Hat', but only where a single item owns them
+        for compact, keys in compact_keys.items():
+            if compact in items_lookup:
+                continue
+            if len(keys) == 1:
+                items_lookup[compact] = items_lookup[keys[0]]
+            else:
+                logger.info(f"Not aliasing '{compact}', it matches several items: {keys}")
         
-        logger.info(f"Loaded {len(items_lookup)} items from database")
+        logger.info(f"Loaded {item_count} items from database")
+        _write_items_cache(source_stat, items_lookup)
         return items_lookup
     except Exception as e:
         logger.error(f"Error loading items database: {e}")
         return {}
 
 items_lookup = load_items_database()
+item_keys = list(items_lookup)
 
 def setup_driver():
     """Setup headless Chrome driver with portable Chrome"""
@@ -149,50 +291,127 @@ def setup_driver():
     chrome_options.add_argument("--disable-dev-shm-usage")
     chrome_options.add_argument("--disable-gpu")
     chrome_options.add_argument("--window-size=1920,1080")
+    # Only the DOM text is scraped: skip images and background chatter
+    chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+    chrome_options.add_argument("--disable-extensions")
+    chrome_options.add_argument("--disable-background-networking")
+    chrome_options.add_argument("--disable-sync")
+    chrome_options.add_argument("--mute-audio")
+    chrome_options.add_argument("--disable-features=Translate,BackForwardCache")
+    chrome_options.add_argument("--proxy-server=direct://")
+    chrome_options.add_argument("--proxy-bypass-list=*")
+    chrome_options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.default_content_setting_values.notifications": 2,
+    })
+    # Return from driver.get() at DOMContentLoaded; scrape_inventory waits on
+    # the elements it needs explicitly, so no implicit wait is configured either
+    chrome_options.page_load_strategy = 'eager'
     
     driver = webdriver.Chrome(options=chrome_options)
     driver.set_page_load_timeout(30)
-    driver.implicitly_wait(5)
     return driver
 
 
-def parse_currency(value_str):
-    """Parse currency string to float with robust handling"""
-    if not value_str or value_str == 'N/A' or value_str == '':
-        return 0.0
-    
+_driver_pool = queue.Queue()
+_driver_uses = {}
+_driver_lock = threading.Lock()
+_drivers_created = 0
+
+
+def _new_pooled_driver():
+    driver = setup_driver()
+    _driver_uses[driver] = 0
+    return driver
+
+
+def acquire_driver():
+    """Check out a pooled driver, starting a new one while the pool is below POOL_SIZE"""
+    global _drivers_created
+    while True:
+        try:
+            return _driver_pool.get_nowait()
+        except queue.Empty:
+            pass
+
+        with _driver_lock:
+            can_create = _drivers_created < POOL_SIZE
+            if can_create:
+                _drivers_created += 1
+        if can_create:
+            try:
+                return _new_pooled_driver()
+            except Exception:
+                with _driver_lock:
+                    _drivers_created -= 1
+                raise
+
+        try:
+            return _driver_pool.get(timeout=1)
+        except queue.Empty:
+            continue
+
+
+def release_driver(driver):
+    """Return a driver to the pool, replacing it once it has served DRIVER_MAX_USES scrapes"""
+    global _drivers_created
+    uses = _driver_uses.get(driver, 0) + 1
     try:
-        # Remove currency symbols, commas, and whitespace
-        cleaned = re.sub(r'[^\d.]', '', str(value_str))
-        return float(cleaned) if cleaned else 0.0
-    except (ValueError, AttributeError) as e:
-        logger.warning(f"Failed to parse currency '{value_str}': {e}")
-        return 0.0
+        # Drop page state so the next scrape starts clean
+        driver.get("about:blank")
+    except Exception as e:
+        logger.warning(f"Pooled driver unusable, recycling: {e}")
+        uses = DRIVER_MAX_USES
+
+    if uses < DRIVER_MAX_USES:
+        _driver_uses[driver] = uses
+        _driver_pool.put(driver)
+        return
+
+    _driver_uses.pop(driver, None)
+    try:
+        driver.quit()
+    except Exception:
+        pass
+    try:
+        _driver_pool.put(_new_pooled_driver())
+    except Exception as e:
+        logger.error(f"Failed to replace recycled driver: {e}")
+        with _driver_lock:
+            _drivers_created -= 1
+
+
+@atexit.register
+def shutdown_driver_pool():
+    """Quit every idle pooled driver"""
+    while True:
+        try:
+            driver = _driver_pool.get_nowait()
+        except queue.Empty:
+            break
+        try:
+            driver.quit()
+        except Exception:
+            pass
 
-def find_item_in_database(item_name, items_lookup):
+
+@functools.lru_cache(maxsize=8192)
+def find_item_in_database(item_name):
     """Find item in database with fuzzy matching"""
-    item_name_lower = item_name.lower().strip()
-    
-    # Direct match
-    if item_name_lower in items_lookup:
-        return items_lookup[item_name_lower]
-    
-    # Clean match (without special characters)
-    item_name_clean = re.sub(r'[^\w\s]', '', item_name_lower)
-    if item_name_clean in items_lookup:
-        return items_lookup[item_name_clean]
+    key = normalize_item_name(item_name)
+    hit = items_lookup.get(key)
+    if hit is None:
+        hit = items_lookup.get(compact_item_name(key))
+    if hit is not None:
+        return hit
     
-    # Partial match disabled - too risky for false positives
-    # Only do partial matching if the name is at least 80% similar
-    for key, value in items_lookup.items():
-        if len(item_name_clean) > 4 and len(key) > 4:
-            # Check if one is substantially contained in the other (at least 80% overlap)
-            shorter = min(len(item_name_clean), len(key))
-            longer = max(len(item_name_clean), len(key))
-            if shorter / longer >= 0.8:
-                if item_name_clean in key or key in item_name_clean:
-                    logger.info(f"Fuzzy matched '{item_name}' to '{value.get('name', key)}'")
-                    return value
+    # Fuzzy match - only accept close matches to avoid false positives
+    if len(key) > 4:
+        match = process.extractOne(key, item_keys, scorer=fuzz.ratio, score_cutoff=80)
+        if match:
+            value = items_lookup[match[0]]
+            logger.info(f"Fuzzy matched '{item_name}' to '{value.get('name', match[0])}'")
+            return value
     
     return None
 
@@ -201,7 +420,6 @@ def safe_click(driver, element, max_retries=3):
     for attempt in range(max_retries):
         try:
             driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
-            time.sleep(0.3)
             driver.execute_script("arguments[0].click();", element)
             return True
         except StaleElementReferenceException:
@@ -215,280 +433,283 @@ def safe_click(driver, element, max_retries=3):
             time.sleep(0.5)
     return False
 
-def scrape_inventory(ign):
-    """Scrape inventory from zeqa.net profile with robust error handling"""
-    driver = None
+CATEGORY_SELECTOR = ".black-dropdown.black-zeqa-dropdown"
+
+# Reads every category's header, owned count and visible item names in one round-trip
+_READ_CATEGORIES_JS = """
+return Array.from(document.querySelectorAll(arguments[0])).map(c => {
+    const header = c.querySelector('h6');
+    const count = Array.from(c.querySelectorAll('h3'))
+        .map(h => h.innerText.trim())
+        .find(t => t.includes('/'));
+    const items = Array.from(c.querySelectorAll('.oreuidiv'))
+        .map(e => {
+            const t = e.querySelector('.oreuitextblock.cosmetics') || e.querySelector('.oreuitextblock');
+            return t ? t.innerText.trim() : '';
+        })
+        .filter(Boolean);
+    return {name: header ? header.innerText.trim() : '', count: count || '', items: items};
+});
+"""
+
+def read_categories(driver):
+    """Return [{name, count, items}] for every cosmetic category on the page"""
+    return driver.execute_script(_READ_CATEGORIES_JS, CATEGORY_SELECTOR) or []
+
+def category_for(categories, name):
+    """Pick a category by header from a read_categories() result"""
+    return next((c for c in categories if c['name'] == name), None)
+
+def get_category(driver, name):
+    """Return the category element whose header matches name, resolved in one XPath query"""
+    matches = driver.find_elements(
+        By.XPATH,
+        "//*[contains(concat(' ', normalize-space(@class), ' '), ' black-dropdown ')"
+        " and contains(concat(' ', normalize-space(@class), ' '), ' black-zeqa-dropdown ')]"
+        f"[.//h6[normalize-space()='{name}']]"
+    )
+    return matches[0] if matches else None
+
+_CATEGORY_HAS_JS = """
+const c = Array.from(document.querySelectorAll(arguments[0])).find(el => {
+    const header = el.querySelector('h6');
+    return header && header.innerText.trim() === arguments[1];
+});
+return !!(c && c.querySelector(arguments[2]));
+"""
+
+def category_has(driver, name, selector):
+    """Check whether the named category contains an element matching selector"""
+    return driver.execute_script(_CATEGORY_HAS_JS, CATEGORY_SELECTOR, name, selector)
+
+# 'ready' once categories render, 'missing' if the page reports an unknown player
+_PROFILE_STATE_JS = """
+if (document.querySelector(arguments[0])) return 'ready';
+const text = document.body ? document.body.innerText : '';
+return /not found|does not exist/.test(text) ? 'missing' : null;
+"""
+
+def _categories_with_counts(driver):
+    """WebDriverWait predicate: the category list once the owned counts have rendered"""
+    categories = read_categories(driver)
+    return categories if any(c['count'] for c in categories) else False
+
+def open_profile(driver, ign):
+    """Load a player's profile and return its categories once the counts have rendered"""
+    url = f"https://app.zeqa.net/profile?player={ign}"
+    driver.get(url)
+    
+    # Wait for page to load completely
+    wait = WebDriverWait(driver, 20)
     
+    # Wait for the cosmetic categories, or an error message if the profile doesn't exist
+    try:
+        state = wait.until(lambda d: d.execute_script(_PROFILE_STATE_JS, f"{CATEGORY_SELECTOR} h6"))
+    except TimeoutException:
+        state = None
+        logger.warning(f"Timed out waiting for cosmetic categories for {ign}")
+    
+    if state == 'missing':
+        raise Exception("Player profile not found")
+    
+    # Scroll to cosmetic collection section
+    driver.execute_script("window.scrollTo(0, document.body.scrollHeight * 0.4);")
+    
+    # Find all category sections once their counts are filled in
+    try:
+        return WebDriverWait(driver, 10).until(_categories_with_counts)
+    except TimeoutException:
+        return read_categories(driver)
+
+def scrape_category(driver, category_name, owned_count):
+    """Expand one category, filter it to owned cosmetics and return the matched items.
+    
+    Returns None if the category could not be processed.
+    """
     try:
-        driver = setup_driver()
-        url = f"https://app.zeqa.net/profile?player={ign}"
-        
-        logger.info(f"Starting inventory scrape for {ign}")
-        driver.get(url)
-        
-        # Wait for page to load completely
         wait = WebDriverWait(driver, 20)
         
-        # Wait for body to be present
-        wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-        time.sleep(3)
+        category = get_category(driver, category_name)
+        if not category:
+            logger.warning(f"Could not relocate category: {category_name}")
+            return None
         
-        # Check if profile exists (look for error messages)
+        # Click on the category to expand it
+        dropdown_toggle = category.find_element(By.CSS_SELECTOR, ".black-dropdown-toggle")
+        safe_click(driver, dropdown_toggle)
+        filter_selector = ".dropdown.zeqa-dropdown select"
         try:
-            error_elements = driver.find_elements(By.XPATH, "//*[contains(text(), 'not found') or contains(text(), 'does not exist')]")
-            if error_elements:
-                raise Exception("Player profile not found")
-        except:
-            pass
+            wait.until(lambda d: category_has(d, category_name, filter_selector))
+        except TimeoutException:
+            logger.warning(f"Filter did not appear for {category_name}")
         
-        # Scroll to cosmetic collection section
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight * 0.4);")
-        time.sleep(2)
-        
-        # Find all category sections with multiple attempts
-        all_categories = []
-        for attempt in range(3):
+        # Find and interact with filter dropdown
+        try:
             try:
-                all_categories = driver.find_elements(By.CSS_SELECTOR, ".black-dropdown.black-zeqa-dropdown")
-                if all_categories:
+                filter_dropdown = category.find_element(By.CSS_SELECTOR, filter_selector)
+            except StaleElementReferenceException:
+                # Expanding re-rendered the category; look it up again
+                category = get_category(driver, category_name)
+                if not category:
+                    logger.warning(f"Could not relocate category after expand: {category_name}")
+                    return None
+                filter_dropdown = category.find_element(By.CSS_SELECTOR, filter_selector)
+            select = Select(filter_dropdown)
+            
+            # Try different variations of "Show Owned"
+            selected = False
+            for option_text in ["Show Owned", "Owned", "show owned"]:
+                try:
+                    select.select_by_visible_text(option_text)
+                    selected = True
                     break
-                time.sleep(1)
-            except Exception as e:
-                logger.warning(f"Attempt {attempt + 1} to find categories failed: {e}")
-                if attempt == 2:
-                    raise
+                except NoSuchElementException:
+                    continue
+            
+            if not selected:
+                # Try by value
+                for option in select.options:
+                    if 'owned' in option.text.lower():
+                        select.select_by_visible_text(option.text)
+                        selected = True
+                        break
+            
+            if not selected:
+                logger.warning(f"Could not select 'Show Owned' for {category_name}")
+                return None
+        except Exception as e:
+            logger.error(f"Error selecting filter for {category_name}: {e}")
+            return None
+        
+        # Wait until the list has been narrowed down to owned items
+        def owned_items_loaded(d):
+            category_info = category_for(read_categories(d), category_name)
+            if category_info is None:
+                return False
+            names = category_info['items']
+            return names if 0 < len(names) <= owned_count else False
+        
+        try:
+            item_names = WebDriverWait(driver, 10).until(owned_items_loaded)
+        except TimeoutException:
+            category_info = category_for(read_categories(driver), category_name)
+            item_names = category_info['items'] if category_info else []
+            if not item_names:
+                logger.error(f"Failed to find items in {category_name}")
+        
+        logger.info(f"Found {len(item_names)} items in {category_name}")
+        
+        owned_items = []
+        for item_name in item_names:
+            # Look up item in database
+            item_data = find_item_in_database(item_name)
+            
+            if item_data:
+                owned_items.append({
+                    'name': item_name,
+                    'category': category_name,
+                    'usd': item_data['_usd'],
+                    'coins': item_data['_coins'],
+                    'shards': item_data['_shards']
+                })
+                
+                logger.info(f"  ✓ {item_name}: ${item_data['_usd']:,.2f}")
+            else:
+                logger.warning(f"   {item_name}: NOT FOUND in database")
+        
+        return owned_items
+        
+    except Exception as e:
+        logger.error(f"Error processing category {category_name}: {e}")
+        return None
+
+def scrape_category_in_pool(ign, category_name, owned_count):
+    """Open the profile on a separate pooled driver and scrape a single category"""
+    driver = acquire_driver()
+    try:
+        all_categories = open_profile(driver, ign)
+        if category_for(all_categories, category_name) is None:
+            logger.warning(f"Could not relocate category: {category_name}")
+            return None
+        return scrape_category(driver, category_name, owned_count)
+    finally:
+        release_driver(driver)
+
+def scrape_inventory(ign):
+    """Scrape inventory from zeqa.net profile with robust error handling"""
+    driver = None
+    
+    try:
+        driver = acquire_driver()
+        
+        logger.info(f"Starting inventory scrape for {ign}")
+        all_categories = open_profile(driver, ign)
         
         if not all_categories:
             raise Exception("No cosmetic categories found on profile")
         
         logger.info(f"Found {len(all_categories)} total categories")
         
-        # Filter to only main cosmetic type categories
-        valid_category_names = ["Artifact", "Cape", "Killphrase", "Projectile", "Mount"]
-        main_categories = []
-        
-        for category in all_categories:
-            try:
-                category_header = category.find_element(By.TAG_NAME, "h6")
-                category_name = category_header.text.strip()
-                if category_name in valid_category_names:
-                    main_categories.append((category, category_name))
-                    logger.info(f"Found main category: {category_name}")
-            except:
+        # Filter to only owned main cosmetic type categories
+        tasks = []
+        for category_info in all_categories:
+            category_name = category_info['name']
+            if category_name not in VALID_CATEGORY_NAMES:
                 continue
+            logger.info(f"Found main category: {category_name}")
+            
+            # Get the count (n/total format)
+            count_text = category_info['count']
+            if not count_text:
+                logger.info(f"No count found for {category_name}, skipping")
+                continue
+            
+            # Parse the count (e.g., "5/295" or "[5/295]" -> owned = 5)
+            match = _COUNT_RE.match(count_text)
+            if not match:
+                logger.warning(f"Invalid count format for {category_name}: {count_text}")
+                continue
+
+            owned_count = int(match.group(1))
+            total_count = int(match.group(2))
+
+            # Skip if no items owned
+            if owned_count == 0:
+                logger.info(f"Skipping {category_name}: 0/{total_count} items")
+                continue
+
+            logger.info(f"Processing {category_name}: {owned_count}/{total_count} items")
+            tasks.append((category_name, owned_count))
         
-        logger.info(f"Processing {len(main_categories)} main categories")
+        # Categories are independent: scrape the first on the page that is already
+        # open and hand the rest to other pooled drivers in parallel
+        futures = [category_executor.submit(scrape_category_in_pool, ign, *task) for task in tasks[1:]]
+        results = []
+        if tasks:
+            results.append(scrape_category(driver, *tasks[0]))
         
-        owned_items = []
-        total_usd = 0.0
-        total_coins = 0.0
-        total_shards = 0.0
-        categories_processed = 0
+        # Give the driver back before blocking so the workers can use it
+        release_driver(driver)
+        driver = None
         
-        for category_tuple in main_categories:
+        for future, (category_name, _) in zip(futures, tasks[1:]):
             try:
-                category, category_name = category_tuple
-                
-                # Re-locate the category in the current page state
-                all_categories = driver.find_elements(By.CSS_SELECTOR, ".black-dropdown.black-zeqa-dropdown")
-                category = None
-                for cat in all_categories:
-                    try:
-                        header = cat.find_element(By.TAG_NAME, "h6")
-                        if header.text.strip() == category_name:
-                            category = cat
-                            break
-                    except:
-                        continue
-                
-                if not category:
-                    logger.warning(f"Could not relocate category: {category_name}")
-                    continue
-                
-                # Get the count (n/total format)
-                try:
-                    count_elements = category.find_elements(By.TAG_NAME, "h3")
-                    count_text = ""
-                    for elem in count_elements:
-                        text = elem.text.strip()
-                        if text and '/' in text:
-                            count_text = text
-                            break
-                    
-                    if not count_text:
-                        logger.info(f"No count found for {category_name}, skipping")
-                        continue
-                except Exception as e:
-                    logger.warning(f"Error getting count for {category_name}: {e}")
-                    continue
-                
-                # Parse the count (e.g., "5/295" or "[5/295]" -> owned = 5)
-                match = re.match(r'\[?(\d+)/(\d+)\]?', count_text)
-                if not match:
-                    logger.warning(f"Invalid count format for {category_name}: {count_text}")
-                    continue
-
-                owned_count = int(match.group(1))
-                total_count = int(match.group(2))
-
-                # Skip if no items owned
-                if owned_count == 0:
-                    logger.info(f"Skipping {category_name}: 0/{total_count} items")
-                    continue
-
-                logger.info(f"Processing {category_name}: {owned_count}/{total_count} items")
-                
-                # Click on the category to expand it
-                dropdown_toggle = category.find_element(By.CSS_SELECTOR, ".black-dropdown-toggle")
-                safe_click(driver, dropdown_toggle)
-                time.sleep(1.5)
-                
-                # Find and interact with filter dropdown
-                try:
-                    # Re-find category after clicking
-                    all_categories = driver.find_elements(By.CSS_SELECTOR, ".black-dropdown.black-zeqa-dropdown")
-                    category = None
-                    for cat in all_categories:
-                        try:
-                            header = cat.find_element(By.TAG_NAME, "h6")
-                            if header.text.strip() == category_name:
-                                category = cat
-                                break
-                        except:
-                            continue
-                    
-                    if not category:
-                        logger.warning(f"Could not relocate category after expand: {category_name}")
-                        continue
-                    
-                    filter_dropdown = category.find_element(By.CSS_SELECTOR, ".dropdown.zeqa-dropdown select")
-                    select = Select(filter_dropdown)
-                    
-                    # Try different variations of "Show Owned"
-                    selected = False
-                    for option_text in ["Show Owned", "Owned", "show owned"]:
-                        try:
-                            select.select_by_visible_text(option_text)
-                            selected = True
-                            break
-                        except:
-                            continue
-                    
-                    if not selected:
-                        # Try by value
-                        for option in select.options:
-                            if 'owned' in option.text.lower():
-                                select.select_by_visible_text(option.text)
-                                selected = True
-                                break
-                    
-                    if not selected:
-                        logger.warning(f"Could not select 'Show Owned' for {category_name}")
-                        continue
-                    
-                    time.sleep(2)
-                except Exception as e:
-                    logger.error(f"Error selecting filter for {category_name}: {e}")
-                    continue
-                
-                # Get all cosmetic items with retry logic
-                cosmetic_items = []
-                for attempt in range(3):
-                    try:
-                        all_categories = driver.find_elements(By.CSS_SELECTOR, ".black-dropdown.black-zeqa-dropdown")
-                        category = None
-                        for cat in all_categories:
-                            try:
-                                header = cat.find_element(By.TAG_NAME, "h6")
-                                if header.text.strip() == category_name:
-                                    category = cat
-                                    break
-                            except:
-                                continue
-                        
-                        if category:
-                            cosmetic_items = category.find_elements(By.CSS_SELECTOR, ".oreuidiv")
-                        if cosmetic_items:
-                            break
-                        time.sleep(1)
-                    except:
-                        if attempt == 2:
-                            logger.error(f"Failed to find items in {category_name}")
-                
-                logger.info(f"Found {len(cosmetic_items)} items in {category_name}")
-                
-                for item_element in cosmetic_items:
-                    try:
-                        # Get item name with multiple selector attempts
-                        item_name = None
-                        try:
-                            item_name_elem = item_element.find_element(By.CSS_SELECTOR, ".oreuitextblock.cosmetics")
-                            item_name = item_name_elem.text.strip()
-                        except:
-                            try:
-                                item_name_elem = item_element.find_element(By.CSS_SELECTOR, ".oreuitextblock")
-                                item_name = item_name_elem.text.strip()
-                            except:
-                                logger.warning("Could not extract item name")
-                                continue
-                        
-                        if not item_name:
-                            continue
-                        
-                        # Look up item in database
-                        item_data = find_item_in_database(item_name, items_lookup)
-                        
-                        if item_data:
-                            # Parse values
-                            usd_value = parse_currency(item_data.get('usd', '0'))
-                            coins_value = parse_currency(item_data.get('coins', '0'))
-                            shards_value = parse_currency(item_data.get('shards', '0'))
-                            
-                            total_usd += usd_value
-                            total_coins += coins_value
-                            total_shards += shards_value
-                            
-                            owned_items.append({
-                                'name': item_name,
-                                'category': category_name,
-                                'usd': usd_value,
-                                'coins': coins_value,
-                                'shards': shards_value
-                            })
-                            
-                            logger.info(f"  ✓ {item_name}: ${usd_value:,.2f}")
-                        else:
-                            logger.warning(f"   {item_name}: NOT FOUND in database")
-                            
-                    except Exception as e:
-                        logger.error(f"Error processing item: {e}")
-                        continue
-                
-                categories_processed += 1
-                
-                # Collapse the category
-                try:
-                    all_categories = driver.find_elements(By.CSS_SELECTOR, ".black-dropdown.black-zeqa-dropdown")
-                    category = None
-                    for cat in all_categories:
-                        try:
-                            header = cat.find_element(By.TAG_NAME, "h6")
-                            if header.text.strip() == category_name:
-                                category = cat
-                                break
-                        except:
-                            continue
-                    
-                    if category:
-                        dropdown_toggle = category.find_element(By.CSS_SELECTOR, ".black-dropdown-toggle")
-                        safe_click(driver, dropdown_toggle)
-                        time.sleep(0.8)
-                except:
-                    pass  # Non-critical if collapse fails
-                
+                results.append(future.result())
             except Exception as e:
                 logger.error(f"Error processing category {category_name}: {e}")
+        
+        owned_items = []
+        categories_processed = 0
+        for category_items in results:
+            if category_items is None:
                 continue
+            owned_items.extend(category_items)
+            categories_processed += 1
+        
+        # fsum avoids accumulating rounding error over hundreds of items
+        total_usd = math.fsum(item['usd'] for item in owned_items)
+        total_coins = math.fsum(item['coins'] for item in owned_items)
+        total_shards = math.fsum(item['shards'] for item in owned_items)
         
         logger.info(f"Scraping complete: {len(owned_items)} items from {categories_processed} categories")
         
@@ -512,22 +733,79 @@ def scrape_inventory(ign):
         }
     finally:
         if driver:
-            try:
-                driver.quit()
-            except:
-                pass
+            release_driver(driver)
+
+_inventory_cache = TTLCache(maxsize=1024, ttl=INVENTORY_CACHE_TTL)
+_inflight_scrapes = {}
+_inventory_lock = threading.Lock()
+
+def get_inventory_cached(ign, force=False):
+    """Return a recent successful scrape for ign, sharing one scrape between concurrent callers"""
+    key = ign.lower()
+    with _inventory_lock:
+        if not force:
+            hit = _inventory_cache.get(key)
+            if hit is not None:
+                return hit
+        future = _inflight_scrapes.get(key)
+        owner = future is None
+        if owner:
+            future = _inflight_scrapes[key] = Future()
+    
+    if not owner:
+        return future.result()
+    
+    try:
+        result = scrape_inventory(ign)
+        if result.get('success'):
+            with _inventory_lock:
+                _inventory_cache[key] = result
+        future.set_result(result)
+        return result
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _inventory_lock:
+            _inflight_scrapes.pop(key, None)
 
 active_evaluations = set()
 
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse, Response
 import uvicorn, os
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
+
+
+@app.on_event("shutdown")
+async def _close_http_session():
+    await close_http_session()
+
+
+def _etag_matches(if_none_match, etag):
+    """Check an If-None-Match header value against an ETag"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+    return '*' in candidates or etag in candidates
+
 
 @app.get("/inventory/{ign}")
-def get_inventory(ign: str):
-    return scrape_inventory(ign)
+async def get_inventory(ign: str, request: Request, force: bool = False):
+    loop = asyncio.get_running_loop()
+    result = await loop.run_in_executor(executor, functools.partial(get_inventory_cached, ign, force=force))
+    if not result.get('success'):
+        return result
+    
+    # Let clients and CDNs reuse the result for as long as the server caches it
+    body = orjson.dumps(result)
+    etag = f'"{hashlib.md5(body).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={INVENTORY_CACHE_TTL}"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 8000))
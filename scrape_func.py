@@ -1,7 +1,9 @@
 import os
-import json
-import difflib
-from datetime import datetime, timezone
+import orjson
+import pickle
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
 from typing import Optional, Tuple
 from utils import load_prices, save_prices
 import aiohttp
@@ -16,6 +18,11 @@ from app import run_app
 import asyncio
 import re
 import time
+import heapq
+import functools
+import itertools
+import queue
+import threading
 import logging
 from pathlib import Path
 from concurrent.futures import ThreadPoolExecutor
@@ -27,13 +34,22 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import Select
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException
 from selenium.webdriver.chrome.service import Service
+import ahocorasick
+from cachetools import LRUCache, TTLCache
+from rapidfuzz import process, fuzz
 
 # =============================
 # Configuration and constants
 # =============================
-VOUCHES_PATH = 'vouches.json'
-ARCHIVE_PATH = 'vouch_archive.json'
+VOUCHES_PATH = 'vouches.json'  # legacy store, imported into VOUCHES_DB once
+VOUCHES_DB = 'vouches.db'
+ARCHIVE_PATH = 'vouch_archive.json'  # legacy archive, copied into ARCHIVE_LOG once
+ARCHIVE_LOG = 'vouch_archive.jsonl'
 ITEMS_PATH = 'items.json'
+# Kept apart from the API's cache since the lookup layout differs
+ITEMS_CACHE_PATH = 'items_lookup_bot.pkl'
+# Bump when the lookup layout built by load_items_database changes
+ITEMS_CACHE_VERSION = 1
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -45,74 +61,516 @@ executor = ThreadPoolExecutor(max_workers=3)
 
 
 
+_CLEAN_RE = re.compile(r'[^\w\s]')
+_CURRENCY_RE = re.compile(r'[^\d.]')
+_COUNT_RE = re.compile(r'\[?(\d+)/(\d+)\]?')
+_NORM_RE = re.compile(r'[\W_]+')
+
+MAX_IMAGE_BYTES = 8 * 1024 * 1024  # Discord avatar size limit
+
+_http_session: Optional[aiohttp.ClientSession] = None
+
+
+def _get_http_session() -> aiohttp.ClientSession:
+    """Return the shared aiohttp session, creating it on first use."""
+    global _http_session
+    if _http_session is None or _http_session.closed:
+        _http_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=100, limit_per_host=10, ttl_dns_cache=300, keepalive_timeout=60),
+            timeout=aiohttp.ClientTimeout(total=15),
+        )
+    return _http_session
+
+
+async def _close_http_session() -> None:
+    global _http_session
+    if _http_session is not None and not _http_session.closed:
+        await _http_session.close()
+    _http_session = None
+
+
+_image_buffers = threading.local()
+
+
+def _image_buffer() -> BytesIO:
+    """Return this thread's scratch buffer for transcoding, emptied for reuse."""
+    buf = getattr(_image_buffers, 'buf', None)
+    # Drop buffers that grew past the cap so one huge image isn't kept alive
+    if buf is None or buf.tell() > MAX_IMAGE_BYTES:
+        buf = _image_buffers.buf = BytesIO()
+    buf.seek(0)
+    buf.truncate()
+    return buf
+
+
+def _is_discord_image(data: bytes) -> bool:
+    """True if the payload's magic bytes are PNG, JPEG, WebP or GIF."""
+    head = data[:12]
+    return (
+        head.startswith(b'\x89PNG')
+        or head.startswith(b'\xff\xd8\xff')
+        or (head[:4] == b'RIFF' and head[8:12] == b'WEBP')
+        or head.startswith(b'GIF8')
+    )
+
+
 async def _fetch_image(url: str) -> Optional[bytes]:
     """Fetch an image from a URL and return its bytes."""
-    async with aiohttp.ClientSession() as session:
-        try:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    content_type = response.headers.get('content-type', '')
-                    if 'image' not in content_type:
-                        return None
-                    data = await response.read()
-                    # Verify image size (Discord avatar size limit: 8MB)
-                    if len(data) > 8 * 1024 * 1024:
+    try:
+        async with _get_http_session().get(url, headers={'Accept': 'image/*'}) as response:
+            if response.status == 200:
+                content_type = response.headers.get('content-type', '')
+                if 'image' not in content_type:
+                    return None
+                # Reject oversized images before reading any of the body
+                if response.content_length is not None and response.content_length > MAX_IMAGE_BYTES:
+                    return None
+                # Stream the body and give up as soon as it exceeds the size limit
+                data = bytearray()
+                async for chunk in response.content.iter_chunked(64 * 1024):
+                    data.extend(chunk)
+                    if len(data) > MAX_IMAGE_BYTES:
                         return None
-                    # Optionally process image with Pillow
-                    try:
-                        img = Image.open(BytesIO(data))
-                        # Convert to PNG or JPEG if needed
-                        output = BytesIO()
-                        img.save(output, format='PNG')
-                        return output.getvalue()
-                    except Exception:
-                        return data  # Fallback to raw data if processing fails
-                return None
-        except Exception as e:
-            print(f"Error fetching image from {url}: {e}")
+                data = bytes(data)
+                # Discord accepts these as-is; only transcode unknown formats
+                if _is_discord_image(data):
+                    return data
+                try:
+                    img = Image.open(BytesIO(data))
+                    output = _image_buffer()
+                    img.convert('RGBA').save(output, format='PNG', compress_level=1, optimize=False)
+                    return output.getvalue()
+                except Exception:
+                    return data  # Fallback to raw data if processing fails
             return None
+    except Exception as e:
+        logger.warning("Error fetching image from %s: %s", url, e)
+        return None
+
+
+# Item thumbnails rarely change, so keep the last few hundred in memory
+ITEM_IMAGE_URL = "https://zeqamart.onrender.com/api/download-image/{}"
+_item_images: LRUCache = LRUCache(maxsize=512)
+
+
+async def _fetch_item_image(name: str) -> Optional[bytes]:
+    """Return the thumbnail for an item, fetching it over the shared session on a cache miss."""
+    cached = _item_images.get(name)
+    if cached is not None:
+        return cached
+    try:
+        image_url = ITEM_IMAGE_URL.format(urllib.parse.quote(name))
+        async with _get_http_session().get(image_url, timeout=aiohttp.ClientTimeout(total=5)) as response:
+            if response.status != 200:
+                logger.warning("Image download failed: HTTP %s", response.status)
+                return None
+            image_data = await response.read()
+    except asyncio.TimeoutError:
+        logger.warning("Timeout downloading image for %s", name)
+        return None
+    except Exception as e:
+        logger.warning("Error downloading image: %s", e)
+        return None
+    _item_images[name] = image_data
+    return image_data
+
+
 def _safe_load_json(path: str) -> dict:
     if not os.path.exists(path):
         return {}
     try:
-        with open(path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
     except Exception:
         # Corrupted JSON or empty file -> safely return empty
         return {}
 
 
-def _safe_save_json(path: str, data: dict) -> None:
-    with open(path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+# =============================
+# Vouch store
+# =============================
+_VOUCH_SCHEMA = """
+CREATE TABLE IF NOT EXISTS vouches (
+    id TEXT PRIMARY KEY,
+    seller_id TEXT NOT NULL,
+    buyer_id TEXT NOT NULL,
+    item TEXT NOT NULL,
+    reason TEXT NOT NULL DEFAULT '',
+    ts TEXT NOT NULL,
+    proof_url TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_seller ON vouches(seller_id, ts);
+CREATE INDEX IF NOT EXISTS idx_buyer ON vouches(buyer_id, ts);
+CREATE TABLE IF NOT EXISTS seller_totals (
+    seller_id TEXT PRIMARY KEY,
+    total INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_total ON seller_totals(total DESC);
+CREATE TABLE IF NOT EXISTS vouch_seq (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    last INTEGER NOT NULL
+);
+"""
+
+_VOUCH_COLUMNS = 'id, seller_id, buyer_id, item, reason, ts, proof_url'
+
+
+@contextmanager
+def _vouch_tx(db: Optional[sqlite3.Connection] = None):
+    """Run the enclosed statements as one write transaction."""
+    db = db or vouch_db
+    db.execute('BEGIN IMMEDIATE')
+    try:
+        yield db
+    except BaseException:
+        db.execute('ROLLBACK')
+        raise
+    db.execute('COMMIT')
+
+
+def _vouch_from_row(row: sqlite3.Row) -> dict:
+    """Shape a vouches row like the entries of the legacy JSON store."""
+    return {
+        'id': row['id'],
+        'from': row['buyer_id'],
+        'item': row['item'],
+        'reason': row['reason'],
+        'timestamp': row['ts'],
+        'proof_url': row['proof_url'],
+    }
+
 
+def _migrate_json_vouches(db: sqlite3.Connection) -> None:
+    """Import vouches.json once; the JSON file is left untouched.
 
-def _generate_vouch_id(vouches: dict) -> str:
-    max_id = 0
-    for seller in vouches.values():
-        for v in seller.get('vouches', []):
-            try:
-                if isinstance(v.get('id'), str) and v['id'].startswith('VX-'):
-                    num = int(v['id'][3:])
-                    max_id = max(max_id, num)
-            except Exception:
-                continue
-    return f"VX-{str(max_id + 1).zfill(4)}"
+    PRAGMA user_version records the import so an emptied database is not refilled on restart.
+    """
+    if db.execute('PRAGMA user_version').fetchone()[0] >= 1:
+        return
+    # Databases from before user_version was set already hold the imported vouches
+    if db.execute('SELECT 1 FROM vouches LIMIT 1').fetchone():
+        db.execute('PRAGMA user_version = 1')
+        return
+    legacy = _safe_load_json(VOUCHES_PATH)
+    rows = [
+        (
+            v.get('id'),
+            seller_id,
+            v.get('from', ''),
+            v.get('item', ''),
+            v.get('reason', ''),
+            v.get('timestamp', ''),
+            v.get('proof_url'),
+        )
+        for seller_id, data in legacy.items()
+        for v in data.get('vouches', [])
+        if v.get('id')
+    ]
+    with _vouch_tx(db):
+        db.executemany(f'INSERT OR IGNORE INTO vouches ({_VOUCH_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+        db.execute('PRAGMA user_version = 1')
+    if not rows:
+        return
+    logger.info(f"Migrated {len(rows)} vouches from {VOUCHES_PATH} to {VOUCHES_DB}")
 
 
-def _find_vouch(vouches: dict, vouch_id: str) -> Optional[Tuple[str, int, dict]]:
-    """Return (seller_id, index, vouch_obj) if found, else None."""
-    for seller_id, data in vouches.items():
-        for idx, v in enumerate(data.get('vouches', [])):
-            if v.get('id') == vouch_id:
-                return seller_id, idx, v
-    return None
+def _max_archived_vouch_number() -> int:
+    """Highest VX- number in the archive log, so ids of removed vouches are not handed out again."""
+    highest = 0
+    try:
+        with open(ARCHIVE_LOG, 'rb') as f:
+            for line in f:
+                try:
+                    entry = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    continue
+                vouches = entry.get('vouches') or [entry.get('vouch')]
+                for v in vouches:
+                    vid = str(v.get('id') or '') if isinstance(v, dict) else ''
+                    if vid.startswith('VX-') and vid[3:].isdigit():
+                        highest = max(highest, int(vid[3:]))
+    except OSError:
+        pass
+    return highest
+
+
+def _open_vouch_db() -> sqlite3.Connection:
+    db = sqlite3.connect(VOUCHES_DB, isolation_level=None, check_same_thread=False)
+    db.row_factory = sqlite3.Row
+    db.execute('PRAGMA journal_mode=WAL')
+    db.execute('PRAGMA synchronous=NORMAL')
+    db.executescript(_VOUCH_SCHEMA)
+    _migrate_json_vouches(db)
+    # Seed the running totals for databases created before seller_totals existed
+    if not db.execute('SELECT 1 FROM seller_totals LIMIT 1').fetchone():
+        with _vouch_tx(db):
+            db.execute('INSERT INTO seller_totals SELECT seller_id, COUNT(*) FROM vouches GROUP BY seller_id')
+    # Start the id counter past every id already handed out; this is the only full scan
+    if not db.execute('SELECT 1 FROM vouch_seq').fetchone():
+        row = db.execute(
+            "SELECT MAX(CAST(SUBSTR(id, 4) AS INTEGER)) FROM vouches WHERE id LIKE 'VX-%'"
+        ).fetchone()
+        with _vouch_tx(db):
+            db.execute(
+                'INSERT INTO vouch_seq (id, last) VALUES (0, ?)', (max(row[0] or 0, _max_archived_vouch_number()),)
+            )
+    return db
+
+
+def _generate_vouch_id(db: sqlite3.Connection) -> str:
+    """Bump the id counter; call inside _vouch_tx so the id commits with the vouch."""
+    db.execute('UPDATE vouch_seq SET last = last + 1')
+    last = db.execute('SELECT last FROM vouch_seq').fetchone()[0]
+    return f"VX-{str(last).zfill(4)}"
+
+
+def _find_vouch(vouch_id: str) -> Optional[Tuple[str, dict]]:
+    """Return (seller_id, vouch_obj) if found, else None."""
+    row = vouch_db.execute(f'SELECT {_VOUCH_COLUMNS} FROM vouches WHERE id = ?', (vouch_id,)).fetchone()
+    if row is None:
+        return None
+    return row['seller_id'], _vouch_from_row(row)
+
+
+def _seller_vouches(seller_id: str) -> list:
+    """All vouches for a seller, oldest first."""
+    rows = vouch_db.execute(
+        f'SELECT {_VOUCH_COLUMNS} FROM vouches WHERE seller_id = ? ORDER BY ts, rowid', (seller_id,)
+    ).fetchall()
+    return [_vouch_from_row(r) for r in rows]
+
+
+# Page rows carry rowid so (ts, rowid) can serve as a keyset cursor
+def _seller_page(seller_id: str, limit: int, offset: int) -> list:
+    """One page of a seller's vouch rows, newest first."""
+    return vouch_db.execute(
+        f'SELECT rowid, {_VOUCH_COLUMNS} FROM vouches WHERE seller_id = ? '
+        'ORDER BY ts DESC, rowid DESC LIMIT ? OFFSET ?',
+        (seller_id, limit, offset),
+    ).fetchall()
+
+
+def _seller_page_older(seller_id: str, cursor: Tuple[str, int], limit: int) -> list:
+    """The page of rows just older than cursor, newest first."""
+    return vouch_db.execute(
+        f'SELECT rowid, {_VOUCH_COLUMNS} FROM vouches WHERE seller_id = ? AND (ts, rowid) < (?, ?) '
+        'ORDER BY ts DESC, rowid DESC LIMIT ?',
+        (seller_id, *cursor, limit),
+    ).fetchall()
+
+
+def _seller_page_newer(seller_id: str, cursor: Tuple[str, int], limit: int) -> list:
+    """The page of rows just newer than cursor, newest first."""
+    rows = vouch_db.execute(
+        f'SELECT rowid, {_VOUCH_COLUMNS} FROM vouches WHERE seller_id = ? AND (ts, rowid) > (?, ?) '
+        'ORDER BY ts, rowid LIMIT ?',
+        (seller_id, *cursor, limit),
+    ).fetchall()
+    return rows[::-1]
+
+
+def _seller_total(seller_id: str) -> int:
+    row = vouch_db.execute('SELECT total FROM seller_totals WHERE seller_id = ?', (seller_id,)).fetchone()
+    return row[0] if row else 0
+
+
+def _top_sellers(limit: int) -> list:
+    return vouch_db.execute(
+        'SELECT seller_id, total FROM seller_totals ORDER BY total DESC LIMIT ?', (limit,)
+    ).fetchall()
+
+
+def _buyer_recent(buyer_id: str, limit: int) -> list:
+    """A buyer's most recent vouches, newest first."""
+    rows = vouch_db.execute(
+        f'SELECT {_VOUCH_COLUMNS} FROM vouches WHERE buyer_id = ? ORDER BY ts DESC, rowid DESC LIMIT ?',
+        (buyer_id, limit),
+    ).fetchall()
+    return [_vouch_from_row(r) for r in rows]
+
+
+def _add_vouch(seller_id: str, buyer_id: str, item: str, reason: str, ts: str, proof_url: Optional[str]) -> Optional[Tuple[str, int]]:
+    """Record a vouch and return (vouch_id, seller total), or None if the buyer already vouched for the seller."""
+    if vouch_db.execute(
+        'SELECT 1 FROM vouches WHERE seller_id = ? AND buyer_id = ? LIMIT 1', (seller_id, buyer_id)
+    ).fetchone():
+        return None
+    with _vouch_tx() as db:
+        vouch_id = _generate_vouch_id(db)
+        db.execute(
+            f'INSERT INTO vouches ({_VOUCH_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (vouch_id, seller_id, buyer_id, item, reason, ts, proof_url),
+        )
+        db.execute(
+            'INSERT INTO seller_totals (seller_id, total) VALUES (?, 1) '
+            'ON CONFLICT(seller_id) DO UPDATE SET total = total + 1',
+            (seller_id,),
+        )
+    return vouch_id, _seller_total(seller_id)
+
+
+def _remove_vouch(vouch_id: str, buyer_id: str) -> Optional[Tuple[str, dict, bool]]:
+    """Delete a vouch if buyer_id created it; returns (seller_id, vouch_obj, deleted), or None if not found."""
+    found = _find_vouch(vouch_id)
+    if found is None:
+        return None
+    seller_id, removed = found
+    # The buyer check is part of the DELETE
+    with _vouch_tx() as db:
+        deleted = db.execute('DELETE FROM vouches WHERE id = ? AND buyer_id = ?', (vouch_id, buyer_id)).rowcount
+        if deleted:
+            db.execute('UPDATE seller_totals SET total = total - 1 WHERE seller_id = ?', (seller_id,))
+            db.execute('DELETE FROM seller_totals WHERE seller_id = ? AND total <= 0', (seller_id,))
+    return seller_id, removed, bool(deleted)
+
+
+_archive_seq = itertools.count()
+
+
+def _new_archive_id() -> str:
+    """Archive ids stay unique even for several archives within one clock tick."""
+    return f"ARCH-{time.time_ns()}-{next(_archive_seq)}"
+
+
+def _append_archive(archive_id: str, entry: dict) -> None:
+    """Append one archive event as a JSON line; the log is never rewritten."""
+    line = orjson.dumps({'archive_id': archive_id, **entry}, option=orjson.OPT_APPEND_NEWLINE)
+    with open(ARCHIVE_LOG, 'ab') as f:
+        f.write(line)
+
+
+def _migrate_json_archive() -> None:
+    """Seed the archive log from vouch_archive.json the first time it is created."""
+    if os.path.exists(ARCHIVE_LOG):
+        return
+    legacy = _safe_load_json(ARCHIVE_PATH)
+    with open(ARCHIVE_LOG, 'ab') as f:
+        for archive_id, entry in legacy.items():
+            f.write(orjson.dumps({'archive_id': archive_id, **entry}, option=orjson.OPT_APPEND_NEWLINE))
+    if legacy:
+        logger.info(f"Migrated {len(legacy)} archive entries from {ARCHIVE_PATH} to {ARCHIVE_LOG}")
+
+
+def _reset_seller(seller_id: str, archive_id: str, entry: dict) -> list:
+    """Archive and delete all of a seller's vouches; returns the removed vouches."""
+    seller_vouches = _seller_vouches(seller_id)
+    if not seller_vouches:
+        return []
+    _append_archive(archive_id, {**entry, 'vouches': seller_vouches})
+    with _vouch_tx() as db:
+        db.execute('DELETE FROM vouches WHERE seller_id = ?', (seller_id,))
+        db.execute('DELETE FROM seller_totals WHERE seller_id = ?', (seller_id,))
+    return seller_vouches
+
+
+# The archive is seeded first so the id counter also accounts for archived vouches
+_migrate_json_archive()
+vouch_db = _open_vouch_db()
+_vouch_lock = threading.Lock()
+
+
+async def _vouch_call(fn, *args):
+    """Run a vouch store helper on a worker thread so the event loop keeps serving gateway events.
+
+    The connection is shared, so calls are serialized and each helper runs as one unit.
+    """
+    def run():
+        with _vouch_lock:
+            return fn(*args)
+    return await asyncio.to_thread(run)
+
+
+# Normalize names: lower, keep alphanumerics only
+@functools.lru_cache(maxsize=4096)
+def _norm(s: str) -> str:
+    return _NORM_RE.sub('', (s or '').lower())
+
+
+# (mtime, items, norm_index, names, lower_names), replaced as a whole so readers never mix builds
+_items_state = (None, [], {}, [], [])
+_items_lock = threading.Lock()
+
+
+def _get_items() -> Tuple[Optional[int], list, dict, list, list]:
+    """Return (mtime, items, norm_index, names, lower_names) from items.json, rebuilt only when it changes.
+
+    names and lower_names are parallel lists used for "did you mean" suggestions.
+    Runs on worker threads; the lock lets one caller rebuild while the others wait.
+    """
+    global _items_state
+    try:
+        mtime = os.stat(ITEMS_PATH).st_mtime_ns
+    except OSError:
+        return None, [], {}, [], []
+    with _items_lock:
+        if _items_state[0] != mtime:
+            raw = _safe_load_json(ITEMS_PATH)
+            items = [e for e in raw.get('items', []) if isinstance(e, dict) and 'name' in e]
+            names = [str(e['name']) for e in items]
+            norm_index = {_norm(n): e for n, e in zip(names, items)}
+            _items_state = (mtime, items, norm_index, names, [n.lower() for n in names])
+        return _items_state
+
+
+def _suggest_names(query: str, names: list) -> list:
+    """Up to three close item names for a query that matched nothing."""
+    return [name for name, _score, _idx in process.extract(query, names, scorer=fuzz.WRatio, limit=3, score_cutoff=50)]
 
 
 def _clamp(s: str, max_len: int = 256) -> str:
     return s if len(s) <= max_len else s[: max_len - 3] + '...'
 
 
+def parse_currency(value_str):
+    """Parse currency string to float with robust handling"""
+    if isinstance(value_str, (int, float)):
+        return float(value_str)
+    if not value_str or value_str == 'N/A' or value_str == '':
+        return 0.0
+    
+    try:
+        # Remove currency symbols, commas, and whitespace
+        cleaned = _CURRENCY_RE.sub('', value_str if isinstance(value_str, str) else str(value_str))
+        return float(cleaned) if cleaned else 0.0
+    except (ValueError, AttributeError) as e:
+        logger.warning(f"Failed to parse currency '{value_str}': {e}")
+        return 0.0
+
+def _read_items_cache(source_stat):
+    """Return the pickled lookup if it was built from the current items.json"""
+    try:
+        with open(ITEMS_CACHE_PATH, 'rb') as f:
+            cached = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable items cache: {e}")
+        return None
+    
+    if (
+        cached.get('version') != ITEMS_CACHE_VERSION
+        or cached.get('mtime') != source_stat.st_mtime_ns
+        or cached.get('size') != source_stat.st_size
+    ):
+        return None
+    return cached['lookup']
+
+def _write_items_cache(source_stat, items_lookup):
+    """Persist the built lookup next to items.json for the next process start"""
+    payload = {
+        'version': ITEMS_CACHE_VERSION,
+        'mtime': source_stat.st_mtime_ns,
+        'size': source_stat.st_size,
+        'lookup': items_lookup,
+    }
+    try:
+        tmp_path = f"{ITEMS_CACHE_PATH}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, ITEMS_CACHE_PATH)
+    except Exception as e:
+        logger.warning(f"Could not write items cache: {e}")
+
 # Load items database
 def load_items_database():
     """Load and validate items database"""
@@ -145,33 +603,54 @@ def load_items_database():
                     }
                 ]
             }
-            with open('items.json', 'w', encoding='utf-8') as f:
-                json.dump(dummy_data, f, indent=2)
+            items_file.write_bytes(orjson.dumps(dummy_data, option=orjson.OPT_INDENT_2))
             logger.info("Created dummy items.json")
         
-        with open('items.json', 'r', encoding='utf-8') as f:
-            items_data = json.load(f)
+        source_stat = items_file.stat()
+        cached = _read_items_cache(source_stat)
+        if cached is not None:
+            logger.info(f"Loaded {len(cached)} items from cache")
+            return cached
+        
+        items_data = orjson.loads(items_file.read_bytes())
         
         if 'items' not in items_data:
             raise ValueError("Invalid items.json structure: missing 'items' key")
         
         items_lookup = {}
         for item in items_data['items']:
-            if 'name' in item:
-                # Create multiple lookup keys for robustness
-                name_lower = item['name'].lower().strip()
-                items_lookup[name_lower] = item
-                # Also store without special characters
-                name_clean = re.sub(r'[^\w\s]', '', name_lower)
-                items_lookup[name_clean] = item
+            name = item.get('name')
+            if not name:
+                continue
+            # Create multiple lookup keys for robustness
+            name_lower = name.lower().strip()
+            # Parse prices once so scrapes can sum them directly
+            item['_usd_f'] = parse_currency(item.get('usd', '0'))
+            item['_coins_f'] = parse_currency(item.get('coins', '0'))
+            item['_shards_f'] = parse_currency(item.get('shards', '0'))
+            items_lookup[name_lower] = item
+            # Also store without special characters
+            if not all(c.isalnum() or c.isspace() or c == '_' for c in name_lower):
+                items_lookup[_CLEAN_RE.sub('', name_lower)] = item
         
         logger.info(f"Loaded {len(items_lookup)} items from database")
+        _write_items_cache(source_stat, items_lookup)
         return items_lookup
     except Exception as e:
         logger.error(f"Error loading items database: {e}")
         return {}
 
+def build_item_automaton(items_lookup):
+    """Compile every lookup key into an Aho-Corasick automaton for partial matching"""
+    automaton = ahocorasick.Automaton()
+    for key, value in items_lookup.items():
+        automaton.add_word(key, (key, len(key), value))
+    automaton.make_automaton()
+    return automaton
+
 items_lookup = load_items_database()
+items_automaton = build_item_automaton(items_lookup)
+item_keys = tuple(items_lookup)
 
 import subprocess
 
@@ -205,10 +684,6 @@ def check_chromedriver_deps():
 
         logger.error(f"Could not check dependencies: {e}")
 
-# Call before setup_driver()
-
-check_chromedriver_deps()
-
 def setup_driver():
     """Setup headless Chrome driver with portable Chrome"""
     import os
@@ -228,6 +703,7 @@ def setup_driver():
     chrome_options = Options()
     chrome_options.binary_location = str(chrome_binary)
     chrome_options.add_argument('--headless=new')
+    chrome_options.add_argument('--incognito')
     chrome_options.add_argument('--no-sandbox')
     chrome_options.add_argument('--disable-dev-shm-usage')
     chrome_options.add_argument('--disable-gpu')
@@ -244,26 +720,96 @@ def setup_driver():
         service = Service(executable_path=str(chromedriver_binary))
         driver = webdriver.Chrome(service=service, options=chrome_options)
         driver.set_page_load_timeout(30)
-        driver.implicitly_wait(5)
         return driver
     except Exception as e:
         logger.error(f"Failed to initialize Chrome driver: {e}")
         logger.error(f"Chrome binary: {chrome_binary} (exists: {chrome_binary.exists()})")
         logger.error(f"ChromeDriver binary: {chromedriver_binary} (exists: {chromedriver_binary.exists()})")
+        check_chromedriver_deps()
         raise
 
-def parse_currency(value_str):
-    """Parse currency string to float with robust handling"""
-    if not value_str or value_str == 'N/A' or value_str == '':
-        return 0.0
-    
+# =============================
+# Driver pool
+# =============================
+POOL_SIZE = 2
+_DRIVER_POOL: "queue.Queue[webdriver.Chrome]" = queue.Queue()
+_drivers_created = 0
+_driver_lock = threading.Lock()
+
+def _start_pooled_driver():
+    """Start a driver for a slot already counted in _drivers_created"""
+    global _drivers_created
     try:
-        # Remove currency symbols, commas, and whitespace
-        cleaned = re.sub(r'[^\d.]', '', str(value_str))
-        return float(cleaned) if cleaned else 0.0
-    except (ValueError, AttributeError) as e:
-        logger.warning(f"Failed to parse currency '{value_str}': {e}")
-        return 0.0
+        return setup_driver()
+    except Exception:
+        with _driver_lock:
+            _drivers_created -= 1
+        raise
+
+def _acquire_driver():
+    """Lease a warm driver, starting one while the pool is below POOL_SIZE"""
+    global _drivers_created
+    while True:
+        try:
+            return _DRIVER_POOL.get_nowait()
+        except queue.Empty:
+            pass
+        with _driver_lock:
+            if _drivers_created < POOL_SIZE:
+                _drivers_created += 1
+                break
+        # Poll so a slot freed by a discarded driver is picked up
+        try:
+            return _DRIVER_POOL.get(timeout=1)
+        except queue.Empty:
+            continue
+    return _start_pooled_driver()
+
+def _release_driver(driver):
+    """Reset a leased driver and return it to the pool, discarding it if broken"""
+    global _drivers_created
+    try:
+        # Cookies are only deleted for the current document, so clear them before leaving the profile page
+        driver.delete_all_cookies()
+        driver.get('about:blank')
+        _DRIVER_POOL.put(driver)
+    except Exception as e:
+        logger.warning(f"Discarding broken Chrome driver: {e}")
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        with _driver_lock:
+            _drivers_created -= 1
+
+def _prefill_driver_pool():
+    """Start drivers up to POOL_SIZE so the first scrapes skip Chrome startup"""
+    global _drivers_created
+    while True:
+        with _driver_lock:
+            if _drivers_created >= POOL_SIZE:
+                return
+            _drivers_created += 1
+        try:
+            _DRIVER_POOL.put(_start_pooled_driver())
+        except Exception as e:
+            logger.warning(f"Could not prefill driver pool: {e}")
+            return
+
+def _shutdown_driver_pool():
+    """Quit every idle pooled driver"""
+    global _drivers_created
+    while True:
+        try:
+            driver = _DRIVER_POOL.get_nowait()
+        except queue.Empty:
+            return
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        with _driver_lock:
+            _drivers_created -= 1
 
 def find_item_in_database(item_name, items_lookup):
     """Find item in database with fuzzy matching"""
@@ -274,21 +820,32 @@ def find_item_in_database(item_name, items_lookup):
         return items_lookup[item_name_lower]
     
     # Clean match (without special characters)
-    item_name_clean = re.sub(r'[^\w\s]', '', item_name_lower)
+    item_name_clean = _CLEAN_RE.sub('', item_name_lower)
     if item_name_clean in items_lookup:
         return items_lookup[item_name_clean]
     
     # Partial match disabled - too risky for false positives
     # Only do partial matching if the name is at least 80% similar
-    for key, value in items_lookup.items():
-        if len(item_name_clean) > 4 and len(key) > 4:
-            # Check if one is substantially contained in the other (at least 80% overlap)
-            shorter = min(len(item_name_clean), len(key))
-            longer = max(len(item_name_clean), len(key))
-            if shorter / longer >= 0.8:
-                if item_name_clean in key or key in item_name_clean:
-                    logger.info(f"Fuzzy matched '{item_name}' to '{value.get('name', key)}'")
-                    return value
+    q_len = len(item_name_clean)
+    if q_len <= 4 or not item_keys:
+        return None
+    
+    # Longest database key contained in the scraped name (at least 80% overlap)
+    min_len = max(5, q_len * 0.8)
+    best_len, best = 0, None
+    for _, (key, key_len, value) in items_automaton.iter(item_name_clean):
+        if key_len >= min_len and key_len > best_len:
+            best_len, best = key_len, value
+    if best:
+        logger.info(f"Fuzzy matched '{item_name}' to '{best.get('name', item_name_clean)}'")
+        return best
+    
+    # Close spellings, including scraped names contained in a longer key
+    match = process.extractOne(item_name_clean, item_keys, scorer=fuzz.ratio, score_cutoff=80)
+    if match:
+        value = items_lookup[match[0]]
+        logger.info(f"Fuzzy matched '{item_name}' to '{value.get('name', match[0])}'")
+        return value
     
     return None
 
@@ -297,7 +854,6 @@ def safe_click(driver, element, max_retries=3):
     for attempt in range(max_retries):
         try:
             driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
-            time.sleep(0.3)
             driver.execute_script("arguments[0].click();", element)
             return True
         except StaleElementReferenceException:
@@ -311,12 +867,78 @@ def safe_click(driver, element, max_retries=3):
             time.sleep(0.5)
     return False
 
+CATEGORY_SELECTOR = ".black-dropdown.black-zeqa-dropdown"
+
+def _tag_categories(driver):
+    """Stamp every category container with its position as data-cat-id"""
+    driver.execute_script(
+        "document.querySelectorAll(arguments[0]).forEach((el, i) => el.setAttribute('data-cat-id', i));",
+        CATEGORY_SELECTOR
+    )
+
+# One round trip for every category's header and n/total count
+_READ_CATEGORIES_JS = """
+return Array.from(document.querySelectorAll(arguments[0])).map((el, i) => {
+    el.setAttribute('data-cat-id', i);
+    const header = el.querySelector('h6');
+    const count = Array.from(el.querySelectorAll('h3'))
+        .map(h => h.innerText.trim())
+        .find(t => t.includes('/'));
+    return {name: header ? header.innerText.trim() : '', count: count || ''};
+});
+"""
+
+# One round trip for every item name shown in a category
+_READ_ITEM_NAMES_JS = """
+return Array.from(arguments[0].querySelectorAll('.oreuidiv')).map(e => {
+    const t = e.querySelector('.oreuitextblock.cosmetics') || e.querySelector('.oreuitextblock');
+    return t ? t.innerText.trim() : null;
+}).filter(Boolean);
+"""
+
+NOT_FOUND_XPATH = "//*[contains(text(), 'not found') or contains(text(), 'does not exist')]"
+FILTER_SELECT_SELECTOR = ".dropdown.zeqa-dropdown select"
+
+def _cat_selector(cid):
+    return f'{CATEGORY_SELECTOR}[data-cat-id="{cid}"]'
+
+def _get_cat(driver, cid):
+    """Return the category tagged cid, re-tagging once if the page re-rendered it"""
+    selector = _cat_selector(cid)
+    found = driver.find_elements(By.CSS_SELECTOR, selector)
+    if not found:
+        _tag_categories(driver)
+        found = driver.find_elements(By.CSS_SELECTOR, selector)
+    return found[0] if found else None
+
+def _profile_state(driver):
+    """Wait condition: category elements once rendered, 'missing' for unknown players"""
+    categories = driver.find_elements(By.CSS_SELECTOR, CATEGORY_SELECTOR)
+    if categories:
+        return categories
+    if driver.find_elements(By.XPATH, NOT_FOUND_XPATH):
+        return 'missing'
+    # Scroll to cosmetic collection section in case it renders lazily
+    driver.execute_script("window.scrollTo(0, document.body.scrollHeight * 0.4);")
+    return False
+
+def _categories_with_counts(driver):
+    """Wait condition: category headers and counts once the owned counts have rendered"""
+    categories = driver.execute_script(_READ_CATEGORIES_JS, CATEGORY_SELECTOR)
+    return categories if any(c['count'] for c in categories) else False
+
+def _owned_item_names(driver, cid, owned_count):
+    """Wait condition: item names once the owned filter has narrowed the list"""
+    category = _get_cat(driver, cid)
+    names = driver.execute_script(_READ_ITEM_NAMES_JS, category) if category else []
+    return names if 0 < len(names) <= owned_count else False
+
 def scrape_inventory(ign):
     """Scrape inventory from zeqa.net profile with robust error handling"""
     driver = None
     
     try:
-        driver = setup_driver()
+        driver = _acquire_driver()
         url = f"https://app.zeqa.net/profile?player={ign}"
         
         logger.info(f"Starting inventory scrape for {ign}")
@@ -325,101 +947,52 @@ def scrape_inventory(ign):
         # Wait for page to load completely
         wait = WebDriverWait(driver, 20)
         
-        # Wait for body to be present
-        wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-        time.sleep(3)
-        
-        # Check if profile exists (look for error messages)
+        # Wait for the categories, or an error message if the profile doesn't exist
         try:
-            error_elements = driver.find_elements(By.XPATH, "//*[contains(text(), 'not found') or contains(text(), 'does not exist')]")
-            if error_elements:
-                raise Exception("Player profile not found")
-        except:
-            pass
-        
-        # Scroll to cosmetic collection section
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight * 0.4);")
-        time.sleep(2)
-        
-        # Find all category sections with multiple attempts
-        all_categories = []
-        for attempt in range(3):
-            try:
-                all_categories = driver.find_elements(By.CSS_SELECTOR, ".black-dropdown.black-zeqa-dropdown")
-                if all_categories:
-                    break
-                time.sleep(1)
-            except Exception as e:
-                logger.warning(f"Attempt {attempt + 1} to find categories failed: {e}")
-                if attempt == 2:
-                    raise
-        
-        if not all_categories:
+            all_categories = wait.until(_profile_state)
+        except TimeoutException:
             raise Exception("No cosmetic categories found on profile")
         
+        if all_categories == 'missing':
+            raise Exception("Player profile not found")
+        
         logger.info(f"Found {len(all_categories)} total categories")
         
         # Filter to only main cosmetic type categories
         valid_category_names = ["Artifact", "Cape", "Killphrase", "Projectile", "Mount"]
         main_categories = []
         
-        for category in all_categories:
-            try:
-                category_header = category.find_element(By.TAG_NAME, "h6")
-                category_name = category_header.text.strip()
-                if category_name in valid_category_names:
-                    main_categories.append((category, category_name))
-                    logger.info(f"Found main category: {category_name}")
-            except:
-                continue
+        # The category shells render before their n/total counts are filled in
+        try:
+            categories = WebDriverWait(driver, 10).until(_categories_with_counts)
+        except TimeoutException:
+            categories = driver.execute_script(_READ_CATEGORIES_JS, CATEGORY_SELECTOR)
+        
+        for cid, info in enumerate(categories):
+            category_name = info['name']
+            if category_name in valid_category_names:
+                main_categories.append((cid, category_name, info['count']))
+                logger.info(f"Found main category: {category_name}")
         
         logger.info(f"Processing {len(main_categories)} main categories")
         
         owned_items = []
-        total_usd = 0.0
+        total_usd_cents = 0
         total_coins = 0.0
         total_shards = 0.0
         categories_processed = 0
         
         for category_tuple in main_categories:
             try:
-                category, category_name = category_tuple
-                
-                # Re-locate the category in the current page state
-                all_categories = driver.find_elements(By.CSS_SELECTOR, ".black-dropdown.black-zeqa-dropdown")
-                category = None
-                for cat in all_categories:
-                    try:
-                        header = cat.find_element(By.TAG_NAME, "h6")
-                        if header.text.strip() == category_name:
-                            category = cat
-                            break
-                    except:
-                        continue
-                
-                if not category:
-                    logger.warning(f"Could not relocate category: {category_name}")
-                    continue
+                cid, category_name, count_text = category_tuple
                 
                 # Get the count (n/total format)
-                try:
-                    count_elements = category.find_elements(By.TAG_NAME, "h3")
-                    count_text = ""
-                    for elem in count_elements:
-                        text = elem.text.strip()
-                        if text and '/' in text:
-                            count_text = text
-                            break
-                    
-                    if not count_text:
-                        logger.info(f"No count found for {category_name}, skipping")
-                        continue
-                except Exception as e:
-                    logger.warning(f"Error getting count for {category_name}: {e}")
+                if not count_text:
+                    logger.info(f"No count found for {category_name}, skipping")
                     continue
                 
                 # Parse the count (e.g., "5/295" or "[5/295]" -> owned = 5)
-                match = re.match(r'\[?(\d+)/(\d+)\]?', count_text)
+                match = _COUNT_RE.match(count_text)
                 if not match:
                     logger.warning(f"Invalid count format for {category_name}: {count_text}")
                     continue
@@ -434,30 +1007,23 @@ def scrape_inventory(ign):
 
                 logger.info(f"Processing {category_name}: {owned_count}/{total_count} items")
                 
+                # Re-locate the category in the current page state
+                category = _get_cat(driver, cid)
+                
+                if not category:
+                    logger.warning(f"Could not relocate category: {category_name}")
+                    continue
+                
                 # Click on the category to expand it
                 dropdown_toggle = category.find_element(By.CSS_SELECTOR, ".black-dropdown-toggle")
                 safe_click(driver, dropdown_toggle)
-                time.sleep(1.5)
+                filter_selector = f"{_cat_selector(cid)} {FILTER_SELECT_SELECTOR}"
                 
                 # Find and interact with filter dropdown
                 try:
-                    # Re-find category after clicking
-                    all_categories = driver.find_elements(By.CSS_SELECTOR, ".black-dropdown.black-zeqa-dropdown")
-                    category = None
-                    for cat in all_categories:
-                        try:
-                            header = cat.find_element(By.TAG_NAME, "h6")
-                            if header.text.strip() == category_name:
-                                category = cat
-                                break
-                        except:
-                            continue
-                    
-                    if not category:
-                        logger.warning(f"Could not relocate category after expand: {category_name}")
-                        continue
-                    
-                    filter_dropdown = category.find_element(By.CSS_SELECTOR, ".dropdown.zeqa-dropdown select")
+                    filter_dropdown = WebDriverWait(driver, 10).until(
+                        EC.visibility_of_element_located((By.CSS_SELECTOR, filter_selector))
+                    )
                     select = Select(filter_dropdown)
                     
                     # Try different variations of "Show Owned"
@@ -481,72 +1047,41 @@ def scrape_inventory(ign):
                     if not selected:
                         logger.warning(f"Could not select 'Show Owned' for {category_name}")
                         continue
-                    
-                    time.sleep(2)
                 except Exception as e:
                     logger.error(f"Error selecting filter for {category_name}: {e}")
                     continue
                 
-                # Get all cosmetic items with retry logic
-                cosmetic_items = []
-                for attempt in range(3):
-                    try:
-                        all_categories = driver.find_elements(By.CSS_SELECTOR, ".black-dropdown.black-zeqa-dropdown")
-                        category = None
-                        for cat in all_categories:
-                            try:
-                                header = cat.find_element(By.TAG_NAME, "h6")
-                                if header.text.strip() == category_name:
-                                    category = cat
-                                    break
-                            except:
-                                continue
-                        
-                        if category:
-                            cosmetic_items = category.find_elements(By.CSS_SELECTOR, ".oreuidiv")
-                        if cosmetic_items:
-                            break
-                        time.sleep(1)
-                    except:
-                        if attempt == 2:
-                            logger.error(f"Failed to find items in {category_name}")
+                # Wait for the filter to leave at most the owned items
+                try:
+                    item_names = WebDriverWait(driver, 10).until(
+                        lambda d: _owned_item_names(d, cid, owned_count)
+                    )
+                except TimeoutException:
+                    logger.warning(f"Owned filter did not settle for {category_name}")
+                    category = _get_cat(driver, cid)
+                    item_names = driver.execute_script(_READ_ITEM_NAMES_JS, category) if category else []
                 
-                logger.info(f"Found {len(cosmetic_items)} items in {category_name}")
+                logger.info(f"Found {len(item_names)} items in {category_name}")
                 
-                for item_element in cosmetic_items:
+                for item_name in item_names:
                     try:
-                        # Get item name with multiple selector attempts
-                        item_name = None
-                        try:
-                            item_name_elem = item_element.find_element(By.CSS_SELECTOR, ".oreuitextblock.cosmetics")
-                            item_name = item_name_elem.text.strip()
-                        except:
-                            try:
-                                item_name_elem = item_element.find_element(By.CSS_SELECTOR, ".oreuitextblock")
-                                item_name = item_name_elem.text.strip()
-                            except:
-                                logger.warning("Could not extract item name")
-                                continue
-                        
-                        if not item_name:
-                            continue
-                        
                         # Look up item in database
                         item_data = find_item_in_database(item_name, items_lookup)
                         
                         if item_data:
                             # Parse values
-                            usd_value = parse_currency(item_data.get('usd', '0'))
-                            coins_value = parse_currency(item_data.get('coins', '0'))
-                            shards_value = parse_currency(item_data.get('shards', '0'))
+                            usd_value = item_data['_usd_f']
+                            coins_value = item_data['_coins_f']
+                            shards_value = item_data['_shards_f']
                             
-                            total_usd += usd_value
+                            total_usd_cents += round(usd_value * 100)
                             total_coins += coins_value
                             total_shards += shards_value
                             
                             owned_items.append({
                                 'name': item_name,
                                 'category': category_name,
+                                'type': item_data.get('type'),
                                 'usd': usd_value,
                                 'coins': coins_value,
                                 'shards': shards_value
@@ -564,21 +1099,13 @@ def scrape_inventory(ign):
                 
                 # Collapse the category
                 try:
-                    all_categories = driver.find_elements(By.CSS_SELECTOR, ".black-dropdown.black-zeqa-dropdown")
-                    category = None
-                    for cat in all_categories:
-                        try:
-                            header = cat.find_element(By.TAG_NAME, "h6")
-                            if header.text.strip() == category_name:
-                                category = cat
-                                break
-                        except:
-                            continue
-                    
+                    category = _get_cat(driver, cid)
                     if category:
                         dropdown_toggle = category.find_element(By.CSS_SELECTOR, ".black-dropdown-toggle")
                         safe_click(driver, dropdown_toggle)
-                        time.sleep(0.8)
+                        WebDriverWait(driver, 3).until(
+                            EC.invisibility_of_element_located((By.CSS_SELECTOR, filter_selector))
+                        )
                 except:
                     pass  # Non-critical if collapse fails
                 
@@ -592,7 +1119,7 @@ def scrape_inventory(ign):
             'success': True,
             'ign': ign,
             'items': owned_items,
-            'total_usd': total_usd,
+            'total_usd': total_usd_cents / 100,
             'total_coins': total_coins,
             'total_shards': total_shards,
             'item_count': len(owned_items),
@@ -608,12 +1135,40 @@ def scrape_inventory(ign):
         }
     finally:
         if driver:
-            try:
-                driver.quit()
-            except:
-                pass
+            _release_driver(driver)
+
+# One scrape per pooled driver; extra requests queue here instead of in a thread
+SCRAPE_SEM = asyncio.Semaphore(POOL_SIZE)
+
+# Successful scrapes are reused for repeat lookups of the same player
+INVENTORY_CACHE_TTL = 300
+_inventory_results = TTLCache(maxsize=256, ttl=INVENTORY_CACHE_TTL)
+
+async def scrape_inventory_async(ign):
+    """Run the Selenium scrape off the event loop, at most POOL_SIZE at a time"""
+    key = ign.lower()
+    cached = _inventory_results.get(key)
+    if cached is not None:
+        return cached
+    async with SCRAPE_SEM:
+        result = await asyncio.to_thread(scrape_inventory, ign)
+    if result.get('success'):
+        _inventory_results[key] = result
+    return result
+
+active_evaluations: set = set()
+_AE_LOCK = asyncio.Lock()
+
+async def try_begin_evaluation(key: str) -> bool:
+    """Claim key for an evaluation; False if one is already running"""
+    async with _AE_LOCK:
+        if key in active_evaluations:
+            return False
+        active_evaluations.add(key)
+        return True
 
-active_evaluations = set()
+def end_evaluation(key: str) -> None:
+    active_evaluations.discard(key)
 
 
 
@@ -625,7 +1180,19 @@ intents.message_content = True
 intents.guilds = True
 intents.members = True
 
-bot = commands.Bot(command_prefix=commands.when_mentioned_or('/'), intents=intents)
+class MartBot(commands.Bot):
+    async def close(self):
+        await _close_http_session()
+        await asyncio.to_thread(_shutdown_driver_pool)
+        await super().close()
+
+
+bot = MartBot(command_prefix=commands.when_mentioned_or('/'), intents=intents)
+
+
+async def _resolve_user(client: discord.Client, user_id: int) -> discord.User:
+    """Return a user from the client cache, falling back to an API fetch."""
+    return client.get_user(user_id) or await client.fetch_user(user_id)
 
 
 def _build_vouch_embed(
@@ -636,11 +1203,12 @@ def _build_vouch_embed(
     vouch_id: str,
     total_for_seller: int,
     proof_url: Optional[str] = None,
+    timestamp: Optional[datetime] = None,
 ) -> discord.Embed:
     embed = discord.Embed(
         title='New Vouch',
         color=0x00FF7F,
-        timestamp=datetime.now(timezone.utc),
+        timestamp=timestamp or discord.utils.utcnow(),
     )
     embed.set_author(name=f"{buyer} vouched", icon_url=buyer.display_avatar.url if buyer.display_avatar else None)
     embed.set_thumbnail(url=seller.display_avatar.url if seller.display_avatar else None)
@@ -660,14 +1228,15 @@ def _build_vouch_embed(
 # =============================
 @bot.event
 async def on_ready():
-    print(f'Logged in as {bot.user} (ID: {bot.user.id})')
+    logger.info('Logged in as %s (ID: %s)', bot.user, bot.user.id)
+    bot.loop.run_in_executor(executor, _prefill_driver_pool)
     try:
         run_app()
-        print("Admin panel and API started.")
-        print('Admin panel running at http://zeqamart.duckdns.org:8000/panel')
-        print('API running at http://zeqamart.duckdns.org:8000/api')
+        logger.info("Admin panel and API started.")
+        logger.info('Admin panel running at http://zeqamart.duckdns.org:8000/panel')
+        logger.info('API running at http://zeqamart.duckdns.org:8000/api')
     except Exception as e:
-        print(f'Failed to start admin panel: {e}')
+        logger.error('Failed to start admin panel: %s', e)
     #try:
         #run_admin_panel()
       #  print('Admin panel running at http://zmpanel.duckdns.org:8000')
@@ -680,9 +1249,9 @@ async def on_ready():
        # print(f'Failed to start API: {e}')
     try:
         synced = await bot.tree.sync()
-        print(f'Synced {len(synced)} global commands: {[c.name for c in synced]}')
+        logger.info('Synced %d global commands: %s', len(synced), [c.name for c in synced])
     except Exception as e:
-        print(f'Error syncing commands: {e}')
+        logger.error('Error syncing commands: %s', e)
     await bot.change_presence(activity=discord.Activity(type=discord.ActivityType.watching, name="Zeqa trades"))
 
 
@@ -707,7 +1276,7 @@ async def on_app_command_error(interaction: discord.Interaction, error: app_comm
     except discord.InteractionResponded:
         await interaction.followup.send('An error occurred while processing your command.')
     # Log to console
-    print(f"Error in command {interaction.command.name if interaction.command else 'unknown'}: {error}")
+    logger.error("Error in command %s: %s", interaction.command.name if interaction.command else 'unknown', error)
 
 
 # =============================
@@ -734,38 +1303,21 @@ async def vouch(
         await interaction.response.send_message('You cannot vouch for yourself.', ephemeral=True)
         return
 
-    vouches = _safe_load_json(VOUCHES_PATH)
-    now = datetime.now(timezone.utc).isoformat()
-    vouch_id = _generate_vouch_id(vouches)
-
-    # Duplicate check (one vouch per buyer per seller)
-    data = vouches.get(str(seller.id))
-    if data:
-        for v in data.get('vouches', []):
-            if v.get('from') == str(voucher.id):
-                await interaction.response.send_message('You have already vouched for this seller.', ephemeral=True)
-                return
-    else:
-        vouches[str(seller.id)] = {'vouches': [], 'total': 0}
+    now = discord.utils.utcnow()
 
     proof_url = None
     if proof is not None:
         # Accept only images up to ~8 MB or any attachment URL
         proof_url = proof.url
 
-    vouches[str(seller.id)]['vouches'].append(
-        {
-            'id': vouch_id,
-            'from': str(voucher.id),
-            'item': item,
-            'reason': reason,
-            'timestamp': now,
-            'proof_url': proof_url,
-        }
+    # Duplicate check (one vouch per buyer per seller) runs with the insert
+    added = await _vouch_call(
+        _add_vouch, str(seller.id), str(voucher.id), item, reason, now.isoformat(), proof_url
     )
-    vouches[str(seller.id)]['total'] = len(vouches[str(seller.id)]['vouches'])
-
-    _safe_save_json(VOUCHES_PATH, vouches)
+    if added is None:
+        await interaction.response.send_message('You have already vouched for this seller.', ephemeral=True)
+        return
+    vouch_id, total = added
 
     embed = _build_vouch_embed(
         seller=seller,
@@ -773,96 +1325,142 @@ async def vouch(
         item=item,
         reason=reason,
         vouch_id=vouch_id,
-        total_for_seller=vouches[str(seller.id)]['total'],
+        total_for_seller=total,
         proof_url=proof_url,
+        timestamp=now,
     )
 
     await interaction.response.send_message(embed=embed)
 
 
+class VouchPager(discord.ui.View):
+    """Prev/next buttons for /vcount that step pages with keyset cursors."""
+
+    per_page = 5
+
+    def __init__(self, requester_id: int, seller: discord.User, total: int, page: int, rows: list, timeout: int = 900):
+        super().__init__(timeout=timeout)
+        self.requester_id = requester_id
+        self.seller = seller
+        self.total = total
+        self.max_page = max(1, (total + self.per_page - 1) // self.per_page)
+        self.page = page
+        self.rows = rows
+        self._sync_buttons()
+
+    def _sync_buttons(self) -> None:
+        self.prev_page.disabled = self.page <= 1
+        self.next_page.disabled = self.page >= self.max_page
+
+    def build_embed(self) -> discord.Embed:
+        embed = discord.Embed(
+            title=f"{self.seller.name}'s Vouches",
+            color=0x3498DB,
+            timestamp=discord.utils.utcnow(),
+            description=f"Total: **{self.total}**\nPage {self.page}/{self.max_page}",
+        )
+        embed.set_thumbnail(url=self.seller.display_avatar.url if self.seller.display_avatar else None)
+
+        for v in map(_vouch_from_row, self.rows):
+            buyer_tag = f"<@{v.get('from')}>"
+            reason = _clamp(v.get('reason', ''), 256)
+            item_name = _clamp(v.get('item', ''), 120)
+            ts = v.get('timestamp', 'N/A')
+            vid = v.get('id', 'N/A')
+            proof = v.get('proof_url')
+            value = f"Item: {item_name}\nReason: {reason}\nDate: {ts}\nID: `{vid}`"
+            if proof:
+                value += f"\nProof: {proof}"
+            embed.add_field(name=f"Buyer: {buyer_tag}", value=value, inline=False)
+        return embed
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.requester_id:
+            await interaction.response.send_message('Only the requester can change pages.', ephemeral=True)
+            return False
+        return True
+
+    async def _show(self, interaction: discord.Interaction, rows: list, page: int) -> None:
+        if rows:
+            self.rows = rows
+            self.page = page
+        else:
+            # Vouches were removed since this page was drawn; stop at the current page
+            self.max_page = self.page
+        self._sync_buttons()
+        await interaction.response.edit_message(embed=self.build_embed(), view=self)
+
+    @discord.ui.button(label='Prev', style=discord.ButtonStyle.secondary)
+    async def prev_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        first = self.rows[0]
+        rows = await _vouch_call(_seller_page_newer, str(self.seller.id), (first['ts'], first['rowid']), self.per_page)
+        await self._show(interaction, rows, self.page - 1)
+
+    @discord.ui.button(label='Next', style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        last = self.rows[-1]
+        rows = await _vouch_call(_seller_page_older, str(self.seller.id), (last['ts'], last['rowid']), self.per_page)
+        await self._show(interaction, rows, self.page + 1)
+
+
 @app_commands.describe(
     seller="Seller to view", page="Page number (5 vouches per page)"
 )
 @bot.tree.command(name='vcount', description="View a seller's vouch history with pagination.")
-async def vcount(interaction: discord.Interaction, seller: discord.User, page: int = 1):
-    vouches = _safe_load_json(VOUCHES_PATH)
-    data = vouches.get(str(seller.id))
-    if not data or not data.get('vouches'):
+async def vcount(interaction: discord.Interaction, seller: discord.User, page: app_commands.Range[int, 1, 10000] = 1):
+    total = await _vouch_call(_seller_total, str(seller.id))
+    if not total:
         await interaction.response.send_message('No vouches found for this seller.')
         return
 
-    per_page = 5
-    total = data['total']
-    items = data['vouches']
+    per_page = VouchPager.per_page
 
     # Pagination
-    max_page = max(1, (len(items) + per_page - 1) // per_page)
+    max_page = max(1, (total + per_page - 1) // per_page)
     page = max(1, min(page, max_page))
     start = (page - 1) * per_page
-    end = start + per_page
 
-    embed = discord.Embed(
-        title=f"{seller.name}'s Vouches",
-        color=0x3498DB,
-        timestamp=datetime.now(timezone.utc),
-        description=f"Total: **{total}**\nPage {page}/{max_page}",
-    )
-    embed.set_thumbnail(url=seller.display_avatar.url if seller.display_avatar else None)
-
-    for v in items[::-1][start:end]:
-        buyer_tag = f"<@{v.get('from')}>"
-        reason = _clamp(v.get('reason', ''), 256)
-        item_name = _clamp(v.get('item', ''), 120)
-        ts = v.get('timestamp', 'N/A')
-        vid = v.get('id', 'N/A')
-        proof = v.get('proof_url')
-        value = f"Item: {item_name}\nReason: {reason}\nDate: {ts}\nID: `{vid}`"
-        if proof:
-            value += f"\nProof: {proof}"
-        embed.add_field(name=f"Buyer: {buyer_tag}", value=value, inline=False)
-
-    await interaction.response.send_message(embed=embed)
+    rows = await _vouch_call(_seller_page, str(seller.id), per_page, start)
+    view = VouchPager(interaction.user.id, seller, total, page, rows)
+    if view.max_page > 1:
+        await interaction.response.send_message(embed=view.build_embed(), view=view)
+    else:
+        await interaction.response.send_message(embed=view.build_embed())
 
 
 @app_commands.describe(vouch_id='The vouch ID to remove (you must be the voucher)')
 @bot.tree.command(name='unvouch', description='Remove a vouch you created, by its ID.')
 async def unvouch(interaction: discord.Interaction, vouch_id: str):
-    vouches = _safe_load_json(VOUCHES_PATH)
-    found = _find_vouch(vouches, vouch_id)
-    if not found:
+    result = await _vouch_call(_remove_vouch, vouch_id, str(interaction.user.id))
+    if not result:
         await interaction.response.send_message('Vouch ID not found.', ephemeral=True)
         return
 
-    seller_id, idx, vobj = found
-    if vobj.get('from') != str(interaction.user.id):
+    # Remove and archive
+    seller_id, removed, deleted = result
+    if not deleted:
         await interaction.response.send_message('You can only remove vouches you created.', ephemeral=True)
         return
 
-    # Remove and archive
-    removed = vouches[seller_id]['vouches'].pop(idx)
-    vouches[seller_id]['total'] = len(vouches[seller_id]['vouches'])
-    _safe_save_json(VOUCHES_PATH, vouches)
-
-    archive = _safe_load_json(ARCHIVE_PATH)
-    archive_id = f"ARCH-{int(datetime.now(timezone.utc).timestamp())}"
-    archive[archive_id] = {
+    now = discord.utils.utcnow()
+    archive_id = _new_archive_id()
+    await asyncio.to_thread(_append_archive, archive_id, {
         'action': 'unvouch',
         'seller': seller_id,
         'vouch': removed,
         'by': str(interaction.user.id),
-        'timestamp': datetime.now(timezone.utc).isoformat(),
-    }
-    _safe_save_json(ARCHIVE_PATH, archive)
+        'timestamp': now.isoformat(),
+    })
 
     try:
-        seller_user = await interaction.client.fetch_user(int(seller_id))
+        seller_user = await _resolve_user(interaction.client, int(seller_id))
     except Exception:
         seller_user = discord.Object(id=int(seller_id))  # fallback mention
 
     embed = discord.Embed(
         title='Vouch Removed',
         color=0xE74C3C,
-        timestamp=datetime.now(timezone.utc),
+        timestamp=now,
         description=f"Removed vouch `{vouch_id}` for {getattr(seller_user, 'mention', f'<@{seller_id}>')}.",
     )
     await interaction.response.send_message(embed=embed)
@@ -872,15 +1470,12 @@ async def unvouch(interaction: discord.Interaction, vouch_id: str):
 @bot.tree.command(name='leaderboard', description='Show top sellers by vouch count.')
 async def leaderboard(interaction: discord.Interaction, limit: int = 10):
     limit = max(1, min(limit, 25))
-    vouches = _safe_load_json(VOUCHES_PATH)
-    ranking = sorted(
-        ((sid, data.get('total', 0)) for sid, data in vouches.items()), key=lambda x: x[1], reverse=True
-    )[:limit]
+    ranking = await _vouch_call(_top_sellers, limit)
 
     embed = discord.Embed(
         title='Top Sellers Leaderboard',
         color=0xF1C40F,
-        timestamp=datetime.now(timezone.utc),
+        timestamp=discord.utils.utcnow(),
     )
 
     if not ranking:
@@ -898,12 +1493,7 @@ async def leaderboard(interaction: discord.Interaction, limit: int = 10):
 
 @bot.tree.command(name='my_vouches', description='See your last 5 vouches you have given.')
 async def my_vouches(interaction: discord.Interaction):
-    vouches = _safe_load_json(VOUCHES_PATH)
-    mine = []
-    for data in vouches.values():
-        for v in data.get('vouches', []):
-            if v.get('from') == str(interaction.user.id):
-                mine.append((data, v))
+    mine = await _vouch_call(_buyer_recent, str(interaction.user.id), 5)
 
     if not mine:
         await interaction.response.send_message('You have not vouched for anyone yet.')
@@ -912,10 +1502,10 @@ async def my_vouches(interaction: discord.Interaction):
     embed = discord.Embed(
         title=f"{interaction.user.name}'s recent vouches",
         color=0x2ECC71,
-        timestamp=datetime.now(timezone.utc),
+        timestamp=discord.utils.utcnow(),
     )
 
-    for _, v in mine[-5:][::-1]:
+    for v in mine:
         vid = v.get('id', 'N/A')
         ts = v.get('timestamp', 'N/A')
         item_name = _clamp(v.get('item', ''), 120)
@@ -932,28 +1522,26 @@ async def my_vouches(interaction: discord.Interaction):
 @app_commands.describe(vouch_id='The vouch ID to look up')
 @bot.tree.command(name='vouch_info', description='Get details about a vouch by its ID.')
 async def vouch_info(interaction: discord.Interaction, vouch_id: str):
-    vouches = _safe_load_json(VOUCHES_PATH)
-    found = _find_vouch(vouches, vouch_id)
+    found = await _vouch_call(_find_vouch, vouch_id)
     if not found:
         await interaction.response.send_message('Vouch ID not found.', ephemeral=True)
         return
 
-    seller_id, _idx, v = found
-    try:
-        seller_user = await interaction.client.fetch_user(int(seller_id))
-    except Exception:
+    seller_id, v = found
+    seller_user, buyer_user = await asyncio.gather(
+        _resolve_user(interaction.client, int(seller_id)),
+        _resolve_user(interaction.client, int(v.get('from') or 0)),
+        return_exceptions=True,
+    )
+    if isinstance(seller_user, BaseException):
         seller_user = None
-
-    buyer_user = None
-    try:
-        buyer_user = await interaction.client.fetch_user(int(v.get('from', 0)))
-    except Exception:
+    if isinstance(buyer_user, BaseException):
         buyer_user = None
 
     embed = discord.Embed(
         title='Vouch Information',
         color=0x95A5A6,
-        timestamp=datetime.now(timezone.utc),
+        timestamp=discord.utils.utcnow(),
     )
     embed.add_field(name='Vouch ID', value=vouch_id, inline=False)
     if seller_user:
@@ -979,43 +1567,21 @@ async def vouch_info(interaction: discord.Interaction, vouch_id: str):
 @app_commands.describe(cosmetic='Cosmetic name (case-insensitive)')
 @bot.tree.command(name='stock', description='Get the stock count of a cosmetic (case-insensitive).')
 async def stock(interaction: discord.Interaction, cosmetic: str):
-    raw = _safe_load_json(ITEMS_PATH)
-    if not raw:
+    _, items, norm_index, names, lower_names = await asyncio.to_thread(_get_items)
+    if not items:
         await interaction.response.send_message('No stock data available.')
         return
 
-    # Extract {name: stock} from {"items": [...]}
-    data = {}
-    for item in raw.get('items', []):
-        if isinstance(item, dict) and 'name' in item:
-            name = str(item['name'])
-            val = item.get('stock', 0)
-            try:
-                val = int(val)
-            except Exception:
-                val = 0
-            data[name] = val
-
-    if not data:
-        await interaction.response.send_message('No stock data available.')
-        return
-
-    # Normalize names: trim, lower, keep alphanumerics only
-    def _norm(s: str) -> str:
-        s = (s or '').strip().lower()
-        return ''.join(ch for ch in s if ch.isalnum())
-
     query = cosmetic or ''
-    key_map = {_norm(k): k for k in data.keys()}
-    key = key_map.get(_norm(query))
+    entry = norm_index.get(_norm(query))
 
-    if key is None:
+    if entry is None:
         # Try substring suggestions using stripped/lowered comparison
         ql = query.strip().lower()
-        candidates = [k for k in data.keys() if ql in k.lower()]
+        candidates = [n for n, ln in zip(names, lower_names) if ql in ln]
         if not candidates:
             # Fallback to fuzzy matches
-            candidates = difflib.get_close_matches(query, list(data.keys()), n=3, cutoff=0.5)
+            candidates = _suggest_names(query, names)
         if not candidates:
             await interaction.response.send_message(f'Cosmetic "{cosmetic}" not found.')
             return
@@ -1025,58 +1591,29 @@ async def stock(interaction: discord.Interaction, cosmetic: str):
         )
         return
 
-    stock_val = data.get(key, 0)
+    key = str(entry['name'])
+    stock_val = entry.get('stock', 0)
     # Normalize possible string numbers
     try:
         stock_val = int(stock_val)
     except Exception:
-        pass
+        stock_val = 0
 
     embed = discord.Embed(
         title='Cosmetic Stock',
         color=0x00e676,
-        timestamp=datetime.now(timezone.utc),
+        timestamp=discord.utils.utcnow(),
     )
     embed.add_field(name='Cosmetic', value=key, inline=True)
     embed.add_field(name='Stock', value=str(stock_val), inline=True)
 
     await interaction.response.send_message(embed=embed)
     
-@app_commands.describe(item='Item name (case-insensitive)')
-@bot.tree.command(name='worth', description='Show the worth of an item in shards, coins, and USD.')
-async def worth(interaction: discord.Interaction, item: str):
-    # Defer immediately to prevent timeout
-    await interaction.response.defer()
-    
-    raw = _safe_load_json(ITEMS_PATH)
-    raw = raw.get('items', [])
-    if not raw or not isinstance(raw, list):
-        await interaction.followup.send('No item pricing data available.')
-        return
-
-    def _norm(s: str) -> str:
-        s = (s or '').strip().lower()
-        return ''.join(ch for ch in s if ch.isalnum())
+# Built /worth embeds as dicts, keyed by (item name, items.json mtime) so edits invalidate them
+_worth_embeds: LRUCache = LRUCache(maxsize=256)
 
-    key_map = {_norm(entry.get('name', '')): entry for entry in raw if isinstance(entry, dict)}
-    entry = key_map.get(_norm(item))
 
-    if entry is None:
-        ql = (item or '').strip().lower()
-        names = [e.get('name', '') for e in raw if isinstance(e, dict)]
-        candidates = [n for n in names if ql in n.lower()]
-        if not candidates:
-            candidates = difflib.get_close_matches(item, names, n=3, cutoff=0.5)
-        print(f"No match for '{item}'. Suggestions: {candidates}")
-        if not candidates:
-            await interaction.followup.send(f'Item "{item}" not found.')
-            return
-        await interaction.followup.send(
-            f'Item "{item}" not found. Did you mean: {", ".join(candidates)}?'
-        )
-        return
-
-    name = entry.get('name', item)
+def _build_worth_embed(entry: dict, name: str) -> discord.Embed:
     shards = entry.get('shards', 'N/A')
     coins = entry.get('coins', 'N/A')
     usd = entry.get('usd', 'N/A')
@@ -1085,7 +1622,6 @@ async def worth(interaction: discord.Interaction, item: str):
     item_id = entry.get('id', 'N/A')
     existing_items = entry.get('existingItems', 'N/A')
 
-
     # Get color from item data or use default based on category
     color_hex = entry.get('color')
     if not color_hex:
@@ -1115,7 +1651,6 @@ async def worth(interaction: discord.Interaction, item: str):
     embed = discord.Embed(
         title=f"{name}",
         color=color,
-        timestamp=datetime.now(timezone.utc),
     )
 
     embed.add_field(name='📦 Type', value=item_type, inline=True)
@@ -1125,28 +1660,51 @@ async def worth(interaction: discord.Interaction, item: str):
     embed.add_field(name='💵 USD', value=str(usd), inline=False)
     embed.add_field(name='🆔 ID', value=str(item_id), inline=True)
     embed.add_field(name='🧮 Existing Items', value=str(existing_items), inline=True)
+    return embed
 
 
+@app_commands.describe(item='Item name (case-insensitive)')
+@bot.tree.command(name='worth', description='Show the worth of an item in shards, coins, and USD.')
+async def worth(interaction: discord.Interaction, item: str):
+    # Defer immediately to prevent timeout
+    await interaction.response.defer()
+    
+    mtime, items, norm_index, names, lower_names = await asyncio.to_thread(_get_items)
+    if not items:
+        await interaction.followup.send('No item pricing data available.')
+        return
+
+    entry = norm_index.get(_norm(item))
+
+    if entry is None:
+        ql = (item or '').strip().lower()
+        candidates = [n for n, ln in zip(names, lower_names) if ql in ln]
+        if not candidates:
+            candidates = _suggest_names(item, names)
+        logger.debug("No match for '%s'. Suggestions: %s", item, candidates)
+        if not candidates:
+            await interaction.followup.send(f'Item "{item}" not found.')
+            return
+        await interaction.followup.send(
+            f'Item "{item}" not found. Did you mean: {", ".join(candidates)}?'
+        )
+        return
+
+    name = entry.get('name', item)
+    embed_dict = _worth_embeds.get((name, mtime))
+    if embed_dict is None:
+        embed_dict = _build_worth_embed(entry, name).to_dict()
+        _worth_embeds[(name, mtime)] = embed_dict
+    embed = discord.Embed.from_dict(embed_dict)
+    embed.timestamp = discord.utils.utcnow()
+
     # Try to fetch image with timeout
-    try:
-        image_url = f"https://zeqamart.onrender.com/api/download-image/{urllib.parse.quote(name)}"
-        
-        timeout = aiohttp.ClientTimeout(total=5)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            async with session.get(image_url) as response:
-                if response.status == 200:
-                    image_data = await response.read()
-                    file = discord.File(BytesIO(image_data), filename="item.png")
-                    embed.set_thumbnail(url="attachment://item.png")
-                    await interaction.followup.send(embed=embed, file=file)
-                    return
-                else:
-                    print(f"Image download failed: HTTP {response.status}")
-                
-    except asyncio.TimeoutError:
-        print(f"Timeout downloading image for {name}")
-    except Exception as e:
-        print(f"Error downloading image: {e}")
+    image_data = await _fetch_item_image(name)
+    if image_data is not None:
+        file = discord.File(BytesIO(image_data), filename="item.png")
+        embed.set_thumbnail(url="attachment://item.png")
+        await interaction.followup.send(embed=embed, file=file)
+        return
     
     # Fallback: send without image
     await interaction.followup.send(embed=embed)
@@ -1169,31 +1727,23 @@ class ConfirmResetView(discord.ui.View):
     @discord.ui.button(label='Confirm reset', style=discord.ButtonStyle.danger)
     async def confirm(self, interaction: discord.Interaction, button: discord.ui.Button):
         # Perform reset
-        vouches = _safe_load_json(VOUCHES_PATH)
-        data = vouches.get(str(self.seller.id))
-        if not data or not data.get('vouches'):
-            await interaction.response.send_message('No vouches to reset.', ephemeral=True)
-            self.stop()
-            return
-
-        archive = _safe_load_json(ARCHIVE_PATH)
-        archive_id = f"ARCH-{int(datetime.now(timezone.utc).timestamp())}"
-        archive[archive_id] = {
+        now = discord.utils.utcnow()
+        archive_id = _new_archive_id()
+        seller_vouches = await _vouch_call(_reset_seller, str(self.seller.id), archive_id, {
             'action': 'reset',
             'seller': str(self.seller.id),
-            'vouches': data['vouches'],
             'staff': str(interaction.user.id),
-            'timestamp': datetime.now(timezone.utc).isoformat(),
-        }
-        _safe_save_json(ARCHIVE_PATH, archive)
-
-        del vouches[str(self.seller.id)]
-        _safe_save_json(VOUCHES_PATH, vouches)
+            'timestamp': now.isoformat(),
+        })
+        if not seller_vouches:
+            await interaction.response.send_message('No vouches to reset.', ephemeral=True)
+            self.stop()
+            return
 
         embed = discord.Embed(
             title='Vouch Reset',
             color=0xE74C3C,
-            timestamp=datetime.now(timezone.utc),
+            timestamp=now,
         )
         embed.add_field(name='Seller', value=self.seller.mention)
         embed.add_field(name='Staff', value=interaction.user.mention)
@@ -1208,6 +1758,18 @@ class ConfirmResetView(discord.ui.View):
         self.stop()
 
 # Rate conversion command
+# (from_unit, to_unit) -> factor; 1 USD = 60,000 coins = 5,000 shards, 1 shard = 12 coins
+RATES = {
+    ('coins', 'usd'): 1 / 60000,
+    ('coins', 'shards'): 1 / 12,
+    ('shards', 'usd'): 1 / 5000,
+    ('shards', 'coins'): 12,
+    ('usd', 'coins'): 60000,
+    ('usd', 'shards'): 5000,
+}
+for _unit in ('coins', 'shards', 'usd'):
+    RATES[(_unit, _unit)] = 1.0
+
 @app_commands.describe(
     amount='Amount to convert',
     from_unit='Unit to convert from: coins, shards, usd',
@@ -1215,46 +1777,14 @@ class ConfirmResetView(discord.ui.View):
 )
 @bot.tree.command(name='convert', description='Convert between coins, shards, and USD using current rates.')
 async def convert(interaction: discord.Interaction, amount: float, from_unit: str, to_unit: str):
-    # Conversion rates
-    rates = {
-        'coins_to_usd': 0.0000166667,  # 1 coin = 0.0000166667 USD (1 USD = 60,000 coins)
-        'coins_to_shards': 0.0833333,  # 1 coin = 0.0833333 shards (1 shard = 12 coins)
-        'shards_to_usd': 0.0002,       # 1 shard = 0.0002 USD (1 USD = 5,000 shards)
-        'shards_to_coins': 12,         # 1 shard = 12 coins
-        'usd_to_coins': 60000,         # 1 USD = 60,000 coins
-        'usd_to_shards': 5000,         # 1 USD = 5,000 shards
-    }
-
     from_unit = from_unit.lower()
     to_unit = to_unit.lower()
-    valid_units = ['coins', 'shards', 'usd']
-    if from_unit not in valid_units or to_unit not in valid_units:
+    rate = RATES.get((from_unit, to_unit))
+    if rate is None:
         await interaction.response.send_message('Units must be one of: coins, shards, usd')
         return
 
-    result = None
-    # Convert input to USD first, then to target
-    if from_unit == to_unit:
-        result = amount
-    elif from_unit == 'coins':
-        if to_unit == 'usd':
-            result = amount * rates['coins_to_usd']
-        elif to_unit == 'shards':
-            result = amount * rates['coins_to_shards']
-    elif from_unit == 'shards':
-        if to_unit == 'usd':
-            result = amount * rates['shards_to_usd']
-        elif to_unit == 'coins':
-            result = amount * rates['shards_to_coins']
-    elif from_unit == 'usd':
-        if to_unit == 'coins':
-            result = amount * rates['usd_to_coins']
-        elif to_unit == 'shards':
-            result = amount * rates['usd_to_shards']
-
-    if result is None:
-        await interaction.response.send_message('Conversion not supported.')
-        return
+    result = amount * rate
 
     # Emoji mapping
     emoji_map = {'coins': '<:emoji_1:1422120631771856956>', 'shards': '<:emoji_1:1422120591724384296>', 'usd': '💵'}
@@ -1287,14 +1817,12 @@ async def inventory(interaction: discord.Interaction, ign: str):
         return
     
     # Check if already evaluating this player
-    if ign.lower() in active_evaluations:
+    if not await try_begin_evaluation(ign.lower()):
         await interaction.response.send_message(
             f"An evaluation for `{ign}` is already in progress. Please wait.",
             ephemeral=True
         )
         return
-    
-    active_evaluations.add(ign.lower())
    
     # Track start time
     start_time = time.time()
@@ -1324,8 +1852,7 @@ async def inventory(interaction: discord.Interaction, ign: str):
         await interaction.response.send_message(embed=loading_embed)
         
         # Run the scraping in a separate thread
-        loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(executor, scrape_inventory, ign)
+        result = await scrape_inventory_async(ign)
         
         if not result['success']:
             error_embed = discord.Embed(
@@ -1345,13 +1872,11 @@ async def inventory(interaction: discord.Interaction, ign: str):
             await interaction.edit_original_response(embed=error_embed)
             return
         
-        # Calculate type counts
+        # Calculate type counts; the scraper already attached each item's database type
         type_counts = {}
         for item in result['items']:
-            item_name = item['name']
-            item_data = find_item_in_database(item_name, items_lookup)
-            if item_data and 'type' in item_data:
-                item_type = item_data['type']
+            item_type = item.get('type')
+            if item_type:
                 type_counts[item_type] = type_counts.get(item_type, 0) + 1
         
         # Create result embed
@@ -1404,16 +1929,14 @@ async def inventory(interaction: discord.Interaction, ign: str):
         # Add most valuable items (top 10) - sort by coins, show all items
         if result['items']:
             # Sort by coins value (highest first)
-            top_items = sorted(result['items'], key=lambda x: x['coins'], reverse=True)[:10]
+            top_items = heapq.nlargest(10, result['items'], key=lambda x: x['coins'])
             
             if top_items:
                 items_text = ""
                 items_added = 0
                 
                 for i, item in enumerate(top_items, 1):
-                    # Get item type from database
-                    item_data = find_item_in_database(item['name'], items_lookup)
-                    item_type = item_data.get('type', 'Unknown') if item_data else 'Unknown'
+                    item_type = item.get('type') or 'Unknown'
                     
                     # Build the item entry
                     item_entry = f"{i}. **{item['name']}** [{item_type}]\n"
@@ -1439,15 +1962,13 @@ async def inventory(interaction: discord.Interaction, ign: str):
         
     finally:
         # Remove from active evaluations
-        active_evaluations.discard(ign.lower())
+        end_evaluation(ign.lower())
 
 # Reset vouch command
 @app_commands.checks.has_permissions(manage_guild=True)
 @bot.tree.command(name='reset_vouch', description='Staff: reset all vouches for a seller (with confirmation).')
 async def reset_vouch(interaction: discord.Interaction, seller: discord.User):
-    vouches = _safe_load_json(VOUCHES_PATH)
-    data = vouches.get(str(seller.id))
-    total = data.get('total', 0) if data else 0
+    total = await _vouch_call(_seller_total, str(seller.id))
 
     view = ConfirmResetView(requester_id=interaction.user.id, seller=seller)
     await interaction.response.send_message(